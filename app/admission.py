@@ -0,0 +1,115 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict
+
+from .config import (
+    ADMISSION_READ_LIMIT,
+    ADMISSION_WRITE_LIMIT,
+    ADMISSION_AUTH_LIMIT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT,
+)
+from .metrics import Collector, Counter, Histogram, gauge_lines
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted in time"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(reason)
+
+
+class AdmissionLimiter:
+    """Cap requests in flight; excess ones wait in a bounded FIFO queue until a deadline"""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting up to timeout; raise Overloaded otherwise"""
+        if self.limit <= 0 or (self.in_flight < self.limit and not self._waiters):
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise Overloaded("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted just as the deadline passed
+                return
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            raise Overloaded("timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Free a slot and hand it to the oldest waiter"""
+        self.in_flight -= 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes straight to the waiter, so in_flight stays the same
+                self.in_flight += 1
+                waiter.set_result(None)
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load"""
+        return {"limit": self.limit, "in_flight": self.in_flight, "queued": self.queued}
+
+
+limiters = {
+    "read": AdmissionLimiter(ADMISSION_READ_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT),
+    "write": AdmissionLimiter(ADMISSION_WRITE_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT),
+    "auth": AdmissionLimiter(ADMISSION_AUTH_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT),
+}
+
+admission_queue_seconds = Histogram(
+    "admission_queue_seconds", "Time requests waited for an admission slot", ("route_class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+admission_rejected_total = Counter(
+    "admission_rejected_total", "Requests shed by admission control", ("route_class", "reason")
+)
+
+
+def route_class(request) -> str:
+    """Admission class of a request: auth, write or read"""
+    if request.path.startswith('/api/auth/'):
+        return "auth"
+    if request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return "read"
+    return "write"
+
+
+def _collect_metrics():
+    stats = {name: limiter.stats() for name, limiter in limiters.items()}
+    lines = gauge_lines("admission_in_flight", "Requests holding an admission slot",
+                        {name: s["in_flight"] for name, s in stats.items()}, "route_class")
+    lines += gauge_lines("admission_queued", "Requests waiting for an admission slot",
+                         {name: s["queued"] for name, s in stats.items()}, "route_class")
+    lines += gauge_lines("admission_limit", "Admission slots per route class",
+                         {name: s["limit"] for name, s in stats.items()}, "route_class")
+    return lines
+
+
+Collector(_collect_metrics)
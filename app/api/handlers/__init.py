@@ -1,7 +1,10 @@
 from .ads import (
     create_ad_handler,
+    create_ads_batch_handler,
     get_ad_handler,
     get_ads_handler,
+    search_ads_handler,
+    export_ads_handler,
     update_ad_handler,
     delete_ad_handler
 )
@@ -1,15 +1,33 @@
 from aiohttp import web
 import json
-from datetime import datetime
-from ...database import create_ad, get_ad, get_all_ads, update_ad, delete_ad
-from ...validators import validate_ad_creation, validate_ad_update
+from datetime import datetime, timezone
+from ...database import (
+    create_ad, create_ads, get_ad, get_ads_by_ids, get_ads_page, iter_ads, update_ad, delete_ad,
+    build_search_query, search_ads, get_ads_change_counter,
+    AdNotFound, NotAdOwner
+)
+from ...validators import validate_ad_creation, validate_ad_update, validate_many
+from ...pagination import encode_cursor, decode_cursor, INT64_MAX
+from ...cache import ads_list_cache, ads_list_flight
+from ...serialization import json_response, dumps_bytes
+from ...config import (
+    ADS_PAGE_DEFAULT_LIMIT, ADS_PAGE_MAX_LIMIT, ADS_BULK_MAX_ITEMS, ADS_BULK_MAX_BODY_SIZE,
+    ADS_EXPORT_BATCH_SIZE, ADS_EXPORT_MAX_CONCURRENT, ADS_LOOKUP_MAX_IDS
+)
 
+_exports_in_flight = 0
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+
+def etag_matches(request, etag: str) -> bool:
+    """Check If-None-Match against an ETag value (without quotes)"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return any(tag.value == etag or tag.value == '*' for tag in if_none_match)
+
+
+def not_modified(etag: str):
+    return web.Response(status=304, headers={'ETag': f'"{etag}"'})
 
 
 def login_required(handler):
@@ -17,7 +35,7 @@ def login_required(handler):
 
     async def decorated(request, *args, **kwargs):
         if 'user' not in request:
-            return web.json_response(
+            return json_response(
                 {"error": "Authentication required"},
                 status=401
             )
@@ -34,7 +52,7 @@ async def create_ad_handler(request):
         user = request['user']
         errors = validate_ad_creation(data)
         if errors:
-            return web.json_response(
+            return json_response(
                 {"errors": errors},
                 status=400
             )
@@ -42,29 +60,117 @@ async def create_ad_handler(request):
         ad_data = {
             'title': data['title'],
             'description': data.get('description', ''),
-            'owner_id': user['id'],
+            'owner_id': user.id,
             'created_at': datetime.utcnow()
         }
 
         ad_id = await create_ad(ad_data)
 
-        return web.json_response(
+        return json_response(
             {
                 'id': ad_id,
                 'message': 'Ad created successfully',
                 'title': ad_data['title']
             },
-            status=201,
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+            status=201
         )
 
     except json.JSONDecodeError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid JSON"},
             status=400
         )
     except Exception as e:
-        return web.json_response(
+        return json_response(
+            {"error": "Internal server error"},
+            status=500
+        )
+
+
+async def _read_bulk_items(request):
+    """Read a JSON array or NDJSON body into a list of items"""
+    if request.content_type == 'application/x-ndjson':
+        items = []
+        for line in (await request.text()).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                items.append(None)
+        return items
+
+    items = await request.json()
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array of ads")
+    return items
+
+
+@login_required
+async def create_ads_batch_handler(request):
+    """Create many ads in one request"""
+    try:
+        user = request['user']
+        # Only this endpoint accepts bodies above the app-wide 1 MiB default
+        items = await _read_bulk_items(request.clone(client_max_size=ADS_BULK_MAX_BODY_SIZE))
+        if not items:
+            return json_response(
+                {"error": "At least one ad is required"},
+                status=400
+            )
+        if len(items) > ADS_BULK_MAX_ITEMS:
+            return json_response(
+                {"error": f"At most {ADS_BULK_MAX_ITEMS} ads can be created per request"},
+                status=413
+            )
+
+        results = []
+        valid = []
+        now = datetime.utcnow()
+        for index, (data, errors) in enumerate(zip(items, validate_many(validate_ad_creation, items))):
+            if errors:
+                results.append({'index': index, 'errors': errors})
+                continue
+            results.append({'index': index})
+            valid.append((results[-1], {
+                'title': data['title'],
+                'description': data.get('description', ''),
+                'owner_id': user.id,
+                'created_at': now
+            }))
+
+        ad_ids = await create_ads([ad_data for _, ad_data in valid])
+        for (result, _), ad_id in zip(valid, ad_ids):
+            result['id'] = ad_id
+
+        return json_response(
+            {
+                'created': len(ad_ids),
+                'failed': len(items) - len(ad_ids),
+                'results': results
+            },
+            status=201 if ad_ids else 400
+        )
+
+    except json.JSONDecodeError:
+        return json_response(
+            {"error": "Invalid JSON"},
+            status=400
+        )
+    except ValueError as e:
+        return json_response(
+            {"error": str(e)},
+            status=400
+        )
+    except web.HTTPRequestEntityTooLarge:
+        return json_response(
+            {"error": f"Request body must not exceed {ADS_BULK_MAX_BODY_SIZE} bytes"},
+            status=413
+        )
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
@@ -74,48 +180,282 @@ async def get_ad_handler(request):
     """Get ad by ID"""
     try:
         ad_id = int(request.match_info['id'])
-        ad = await get_ad(ad_id)
-
-        if not ad:
-            return web.json_response(
+        found = await get_ad(ad_id)
+        if not found:
+            return json_response(
                 {"error": "Ad not found"},
                 status=404
             )
 
-        return web.json_response(
-            ad,
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+        ad, version = found
+        etag = f'ad-{ad_id}-v{version}'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response = json_response(
+            ad
         )
+        response.etag = etag
+        return response
 
     except ValueError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid ad ID"},
             status=400
         )
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
 
 
+def parse_ids(text: str) -> list:
+    """Parse a comma-separated list of ad IDs, dropping repeats but keeping order"""
+    ids = []
+    for part in text.split(','):
+        if not (part.isascii() and part.isdigit()) or int(part) > INT64_MAX:
+            raise ValueError(part)
+        ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+
+async def lookup_ads(request):
+    """Get the ads listed in ?ids=, in request order, with one query"""
+    try:
+        ad_ids = parse_ids(request.query['ids'])
+    except ValueError:
+        return json_response(
+            {"error": "Parameter 'ids' must be a comma-separated list of ad IDs"},
+            status=400
+        )
+    if len(ad_ids) > ADS_LOOKUP_MAX_IDS:
+        return json_response(
+            {"error": f"At most {ADS_LOOKUP_MAX_IDS} ids per request"},
+            status=400
+        )
+
+    try:
+        found = await get_ads_by_ids(ad_ids)
+        return json_response({
+            'items': [found[ad_id][0] for ad_id in ad_ids if ad_id in found],
+            'missing': [ad_id for ad_id in ad_ids if ad_id not in found]
+        })
+
+    except Exception as e:
+        return json_response(
+            {"error": "Internal server error"},
+            status=500
+        )
+
+
+def parse_timestamp(text: str) -> int:
+    """Unix seconds from epoch digits or an ISO 8601 datetime (naive means UTC)"""
+    if text.isascii() and text.isdigit():
+        value = int(text)
+    else:
+        moment = datetime.fromisoformat(text)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        value = int(moment.timestamp())
+    if not 0 <= value <= INT64_MAX:
+        raise ValueError(text)
+    return value
+
+
+def parse_list_filters(query) -> dict:
+    """Listing filters from the query string, as keyword arguments for get_ads_page()"""
+    filters = {}
+    if 'owner_id' in query:
+        owner_id = query['owner_id']
+        if not (owner_id.isascii() and owner_id.isdigit()) or int(owner_id) > INT64_MAX:
+            raise ValueError("Parameter 'owner_id' must be a user ID")
+        filters['owner_id'] = int(owner_id)
+    for name in ('created_after', 'created_before'):
+        if name in query:
+            try:
+                filters[name] = parse_timestamp(query[name])
+            except ValueError:
+                raise ValueError(f"Parameter '{name}' must be an ISO 8601 datetime or Unix seconds")
+    if query.get('title_prefix'):
+        filters['title_prefix'] = query['title_prefix']
+    sort = query.get('sort', 'newest')
+    if sort not in ('newest', 'oldest'):
+        raise ValueError("Parameter 'sort' must be 'newest' or 'oldest'")
+    filters['newest_first'] = sort == 'newest'
+    return filters
+
+
 async def get_ads_handler(request):
-    """Get all ads"""
+    """Get a filtered page of ads, newest first by default, or the ads listed in ?ids="""
+    if 'ids' in request.query:
+        return await lookup_ads(request)
+
     try:
-        ads = await get_all_ads()
+        limit = int(request.query.get('limit', ADS_PAGE_DEFAULT_LIMIT))
+        if limit < 1 or limit > ADS_PAGE_MAX_LIMIT:
+            raise ValueError(limit)
+    except ValueError:
+        return json_response(
+            {"error": f"Limit must be between 1 and {ADS_PAGE_MAX_LIMIT}"},
+            status=400
+        )
 
-        return web.json_response(
-            ads,
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+    try:
+        filters = parse_list_filters(request.query)
+    except ValueError as e:
+        return json_response(
+            {"error": str(e)},
+            status=400
         )
 
+    after = None
+    if request.query.get('cursor'):
+        try:
+            after = tuple(decode_cursor(request.query['cursor'], (int, int)))
+        except ValueError:
+            return json_response(
+                {"error": "Invalid cursor"},
+                status=400
+            )
+
+    try:
+        counter = await get_ads_change_counter()
+        etag = f'ads-{counter}'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        # The change counter in the key keeps pages from other processes' writes apart
+        key = (counter, limit, after, tuple(sorted(filters.items())))
+        body = ads_list_cache.get(key)
+        if body is None:
+            async def build():
+                ads, next_after = await get_ads_page(limit, after, **filters)
+                encoded = dumps_bytes({
+                    'items': ads,
+                    'next_cursor': encode_cursor(list(next_after)) if next_after else None
+                })
+                ads_list_cache.set(key, encoded)
+                return encoded
+
+            body = await ads_list_flight.do(key, build)
+
+        response = web.Response(body=body, content_type='application/json')
+        response.etag = etag
+        return response
+
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
 
 
+async def search_ads_handler(request):
+    """Full-text search over ad titles and descriptions"""
+    query = build_search_query(request.query.get('q', ''))
+    if not query:
+        return json_response(
+            {"error": "Query parameter 'q' is required"},
+            status=400
+        )
+
+    try:
+        limit = int(request.query.get('limit', ADS_PAGE_DEFAULT_LIMIT))
+        if limit < 1 or limit > ADS_PAGE_MAX_LIMIT:
+            raise ValueError(limit)
+    except ValueError:
+        return json_response(
+            {"error": f"Limit must be between 1 and {ADS_PAGE_MAX_LIMIT}"},
+            status=400
+        )
+
+    after = None
+    if request.query.get('cursor'):
+        try:
+            after = tuple(decode_cursor(request.query['cursor'], (float, int)))
+        except ValueError:
+            return json_response(
+                {"error": "Invalid cursor"},
+                status=400
+            )
+
+    try:
+        ads, next_after = await search_ads(query, limit, after)
+
+        return json_response(
+            {
+                'items': ads,
+                'next_cursor': encode_cursor(list(next_after)) if next_after else None
+            }
+        )
+
+    except Exception as e:
+        return json_response(
+            {"error": "Internal server error"},
+            status=500
+        )
+
+
+async def export_ads_handler(request):
+    """Stream all ads as NDJSON or a JSON array"""
+    global _exports_in_flight
+
+    export_format = request.query.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'json'):
+        return json_response(
+            {"error": "Format must be 'ndjson' or 'json'"},
+            status=400
+        )
+
+    # Every export holds its own database connection until the client has read it all
+    if _exports_in_flight >= ADS_EXPORT_MAX_CONCURRENT:
+        return json_response(
+            {"error": "Too many exports in progress, try again later"},
+            status=503,
+            headers={'Retry-After': '5'}
+        )
+
+    _exports_in_flight += 1
+    try:
+        return await _stream_export(request, export_format)
+    finally:
+        _exports_in_flight -= 1
+
+
+async def _stream_export(request, export_format):
+    response = web.StreamResponse()
+    if export_format == 'ndjson':
+        response.content_type = 'application/x-ndjson'
+    else:
+        response.content_type = 'application/json'
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    if export_format == 'json':
+        await response.write(b'[')
+
+    batches = iter_ads(ADS_EXPORT_BATCH_SIZE)
+    first = True
+    try:
+        async for ads in batches:
+            if export_format == 'ndjson':
+                chunk = b''.join(dumps_bytes(ad) + b'\n' for ad in ads)
+            else:
+                chunk = b','.join(dumps_bytes(ad) for ad in ads)
+                if not first:
+                    chunk = b',' + chunk
+            first = False
+            await response.write(chunk)
+    finally:
+        await batches.aclose()
+
+    if export_format == 'json':
+        await response.write(b']')
+    await response.write_eof()
+    return response
+
+
 @login_required
 async def update_ad_handler(request):
     """Update existing ad"""
@@ -123,22 +463,9 @@ async def update_ad_handler(request):
         ad_id = int(request.match_info['id'])
         data = await request.json()
         user = request['user']
-        ad = await get_ad(ad_id)
-        if not ad:
-            return web.json_response(
-                {"error": "Ad not found"},
-                status=404
-            )
-
-        if ad['owner_id'] != user['id']:
-            return web.json_response(
-                {"error": "You can only update your own ads"},
-                status=403
-            )
-
         errors = validate_ad_update(data)
         if errors:
-            return web.json_response(
+            return json_response(
                 {"errors": errors},
                 status=400
             )
@@ -150,26 +477,35 @@ async def update_ad_handler(request):
             if field in data:
                 update_data[field] = data[field]
 
-        if update_data:
-            await update_ad(ad_id, update_data)
+        # Ownership is checked by the UPDATE itself, so there is no read-then-write race
+        await update_ad(ad_id, user.id, update_data)
 
-        return web.json_response(
-            {'message': 'Ad updated successfully'},
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+        return json_response(
+            {'message': 'Ad updated successfully'}
         )
 
+    except AdNotFound:
+        return json_response(
+            {"error": "Ad not found"},
+            status=404
+        )
+    except NotAdOwner:
+        return json_response(
+            {"error": "You can only update your own ads"},
+            status=403
+        )
     except ValueError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid ad ID"},
             status=400
         )
     except json.JSONDecodeError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid JSON"},
             status=400
         )
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
@@ -181,33 +517,29 @@ async def delete_ad_handler(request):
     try:
         ad_id = int(request.match_info['id'])
         user = request['user']
-        ad = await get_ad(ad_id)
-        if not ad:
-            return web.json_response(
-                {"error": "Ad not found"},
-                status=404
-            )
-
-        if ad['owner_id'] != user['id']:
-            return web.json_response(
-                {"error": "You can only delete your own ads"},
-                status=403
-            )
-
-        await delete_ad(ad_id)
+        await delete_ad(ad_id, user.id)
 
-        return web.json_response(
-            {'message': 'Ad deleted successfully'},
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+        return json_response(
+            {'message': 'Ad deleted successfully'}
         )
 
+    except AdNotFound:
+        return json_response(
+            {"error": "Ad not found"},
+            status=404
+        )
+    except NotAdOwner:
+        return json_response(
+            {"error": "You can only delete your own ads"},
+            status=403
+        )
     except ValueError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid ad ID"},
             status=400
         )
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
-        )
\ No newline at end of file
+        )
@@ -1,22 +1,16 @@
-import jwt
 from datetime import datetime, timedelta
-from aiohttp import web
 import json
-from ...database import get_user_by_email, create_user
-from ...security import verify_password, get_password_hash
+from ...database import get_user_by_email, create_user, EmailAlreadyRegistered
+from ...security import verify_password_async, get_password_hash_async, PasswordHasherBusy
 from ...config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from ...validators import validate_user_registration, validate_login, ValidationError
-
-
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+from ...validators import validate_user_registration, validate_login, normalize_email, ValidationError
+from ...serialization import json_response
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
+    import jwt
+
     to_encode = data.copy()
 
     if expires_delta:
@@ -35,47 +29,52 @@ async def register(request):
         data = await request.json()
         errors = validate_user_registration(data)
         if errors:
-            return web.json_response(
+            return json_response(
                 {"errors": errors},
                 status=400
             )
 
-        existing_user = await get_user_by_email(data['email'])
-        if existing_user:
-            return web.json_response(
-                {"error": "Email already registered"},
-                status=400
-            )
-
-        hashed_password = get_password_hash(data['password'])
+        email = normalize_email(data['email'])
+        hashed_password = await get_password_hash_async(data['password'])
 
         user_data = {
-            'email': data['email'],
+            'email': email,
             'username': data['username'],
             'hashed_password': hashed_password,
             'created_at': datetime.utcnow()
         }
 
+        # A single INSERT: the unique email index rejects duplicates, even concurrent ones
         user_id = await create_user(user_data)
 
-        return web.json_response(
+        return json_response(
             {
                 'id': user_id,
-                'email': data['email'],
+                'email': email,
                 'username': data['username'],
                 'message': 'User registered successfully'
             },
-            status=201,
-            dumps=lambda x: json.dumps(x, cls=DateTimeEncoder)
+            status=201
         )
 
     except json.JSONDecodeError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid JSON"},
             status=400
         )
+    except EmailAlreadyRegistered:
+        return json_response(
+            {"error": "Email already registered"},
+            status=400
+        )
+    except PasswordHasherBusy:
+        return json_response(
+            {"error": "Service is busy, try again later"},
+            status=503,
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
@@ -87,39 +86,45 @@ async def login(request):
         data = await request.json()
         errors = validate_login(data)
         if errors:
-            return web.json_response(
+            return json_response(
                 {"errors": errors},
                 status=400
             )
 
-        user = await get_user_by_email(data['email'])
-        if not user or not verify_password(data['password'], user['hashed_password']):
-            return web.json_response(
+        user = await get_user_by_email(normalize_email(data['email']))
+        if not user or not await verify_password_async(data['password'], user.hashed_password):
+            return json_response(
                 {"error": "Incorrect email or password"},
                 status=401
             )
 
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user['email'], "user_id": user['id']},
+            data={"sub": user.email, "user_id": user.id},
             expires_delta=access_token_expires
         )
 
-        return web.json_response({
+        return json_response({
             "access_token": access_token,
             "token_type": "bearer",
-            "user_id": user['id'],
-            "email": user['email'],
-            "username": user['username']
+            "user_id": user.id,
+            "email": user.email,
+            "username": user.username
         })
 
     except json.JSONDecodeError:
-        return web.json_response(
+        return json_response(
             {"error": "Invalid JSON"},
             status=400
         )
+    except PasswordHasherBusy:
+        return json_response(
+            {"error": "Service is busy, try again later"},
+            status=503,
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
\ No newline at end of file
@@ -1,28 +1,75 @@
+import importlib
+from datetime import datetime
 from aiohttp import web
-from .handlers import ads, auth
+from ..serialization import json_response
+from ..config import LAZY_HANDLERS
+from .. import metrics
+
+# (method, path, "module:handler" in app.api.handlers)
+ROUTES = (
+    ('POST', '/api/auth/register', 'auth:register'),
+    ('POST', '/api/auth/login', 'auth:login'),
+    ('POST', '/api/ads', 'ads:create_ad_handler'),
+    ('POST', '/api/ads/batch', 'ads:create_ads_batch_handler'),
+    ('GET', '/api/ads', 'ads:get_ads_handler'),
+    ('GET', '/api/ads/search', 'ads:search_ads_handler'),
+    ('GET', '/api/ads/export', 'ads:export_ads_handler'),
+    ('GET', r'/api/ads/{id:\d+}', 'ads:get_ad_handler'),
+    ('PUT', r'/api/ads/{id:\d+}', 'ads:update_ad_handler'),
+    ('DELETE', r'/api/ads/{id:\d+}', 'ads:delete_ad_handler'),
+)
+
+
+def _resolve(spec: str):
+    module, _, name = spec.partition(':')
+    return getattr(importlib.import_module(f"{__package__}.handlers.{module}"), name)
+
+
+def _lazy_handler(spec: str):
+    """Handler that imports its module on the first request instead of at startup"""
+    handler = None
+
+    async def lazy(request):
+        nonlocal handler
+        if handler is None:
+            handler = _resolve(spec)
+        return await handler(request)
+
+    lazy.__name__ = spec.partition(':')[2]
+    return lazy
+
+
+def preload_handlers():
+    """Import every handler module now, e.g. in the supervisor before workers are forked"""
+    for _, _, spec in ROUTES:
+        _resolve(spec)
 
 
 def setup_routes(app, cors):
     """Setup all API routes"""
 
-    app.router.add_post('/api/auth/register', auth.register)
-    app.router.add_post('/api/auth/login', auth.login)
-    app.router.add_post('/api/ads', ads.create_ad_handler)
-    app.router.add_get('/api/ads', ads.get_ads_handler)
-    app.router.add_get(r'/api/ads/{id:\d+}', ads.get_ad_handler)
-    app.router.add_put(r'/api/ads/{id:\d+}', ads.update_ad_handler)
-    app.router.add_delete(r'/api/ads/{id:\d+}', ads.delete_ad_handler)
+    for method, path, spec in ROUTES:
+        handler = _lazy_handler(spec) if LAZY_HANDLERS else _resolve(spec)
+        app.router.add_route(method, path, handler)
     async def health_check(request):
-        return web.json_response({
+        return json_response({
             "status": "ok",
             "service": "ads-api",
-            "timestamp": web.datetime.datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow().isoformat()
         })
 
     app.router.add_get('/health', health_check)
 
+    async def metrics_handler(request):
+        return web.Response(
+            body=metrics.render().encode(),
+            headers={"Content-Type": metrics.CONTENT_TYPE}
+        )
+
+    app.router.add_get('/metrics', metrics_handler)
+
     async def root(request):
-        return web.json_response({
+        return json_response({
             "message": "Ads API Service",
             "version": "1.0.0",
             "endpoints": {
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Set
+
+from .config import (
+    USER_CACHE_SIZE,
+    USER_CACHE_TTL,
+    TOKEN_CACHE_SIZE,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ADS_LIST_CACHE_SIZE,
+    ADS_LIST_CACHE_TTL,
+)
+from .metrics import Collector, counter_lines, gauge_lines
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value and mark it as recently used"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value, evicting the least recently used entries if full"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Invalidate a single entry"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate all entries"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func(), or the call already running for key"""
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+        # A cancelled caller must not cancel the call other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of calls made and callers that joined one in flight"""
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class BatchLoader:
+    """Coalesce loads by key, DataLoader-style.
+
+    Concurrent loads of one key share a single result, and keys requested
+    in the same event-loop iteration are fetched together by one
+    load_many(keys) call, which returns {key: value}; absent keys load as None.
+    """
+
+    def __init__(self, load_many: Callable[[List[Hashable]], Awaitable[Mapping[Hashable, Any]]],
+                 max_batch_size: int):
+        self.load_many = load_many
+        self.max_batch_size = max(max_batch_size, 1)
+        self._queue: Dict[Hashable, asyncio.Future] = {}
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.loads = 0
+        self.shared = 0
+        self.batches = 0
+
+    async def load(self, key: Hashable) -> Any:
+        """Value for key, from the next batch or the one already in flight"""
+        future = self._queue.get(key) or self._in_flight.get(key)
+        if future is None:
+            self.loads += 1
+            loop = asyncio.get_running_loop()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            future = self._queue[key] = loop.create_future()
+        else:
+            self.shared += 1
+        # A cancelled caller must not cancel the load other callers are waiting on
+        return await asyncio.shield(future)
+
+    def clear(self) -> None:
+        """Make later loads start a fresh batch instead of joining one in flight, e.g. after a write"""
+        self._in_flight.clear()
+
+    def _dispatch(self) -> None:
+        items = list(self._queue.items())
+        self._queue = {}
+        for start in range(0, len(items), self.max_batch_size):
+            batch = dict(items[start:start + self.max_batch_size])
+            self._in_flight.update(batch)
+            self.batches += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            values = await self.load_many(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Retrieved here so a batch nobody awaits any more is not reported as unhandled
+                    future.exception()
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Loads started, loads that joined another, and batches queried"""
+        return {"loads": self.loads, "shared": self.shared, "batches": self.batches}
+
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+# Decoded JWT payloads keyed by token digest, each entry expires at its "exp"
+token_cache = TTLCache(TOKEN_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Encoded GET /api/ads pages, cleared by every ads mutation in app.database
+ads_list_cache = TTLCache(ADS_LIST_CACHE_SIZE, ADS_LIST_CACHE_TTL)
+ads_list_flight = SingleFlight()
+
+
+def _collect_metrics():
+    caches = {"user": user_cache, "token": token_cache, "ads_list": ads_list_cache}
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    lines = []
+    for field in ("hits", "misses", "evictions"):
+        lines += counter_lines(f"cache_{field}_total", f"Cache {field}",
+                               {name: s[field] for name, s in stats.items()}, "cache")
+    lines += gauge_lines("cache_entries", "Entries currently cached",
+                         {name: s["size"] for name, s in stats.items()}, "cache")
+    flight = ads_list_flight.stats()
+    lines += counter_lines("singleflight_calls_total", "Calls started by single-flight groups",
+                           {"ads_list": flight["calls"]}, "group")
+    lines += counter_lines("singleflight_shared_total", "Callers that joined a call in flight",
+                           {"ads_list": flight["shared"]}, "group")
+    return lines
+
+
+Collector(_collect_metrics)
@@ -1,12 +1,59 @@
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+
+def _load_env_file() -> None:
+    """Load the nearest .env above this package, importing python-dotenv only if there is one"""
+    here = Path(__file__).resolve().parent
+    for directory in (here, *here.parents):
+        path = directory / ".env"
+        if path.is_file():
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+
+
+_load_env_file()
 
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8080))
+WORKERS = int(os.getenv("WORKERS", 1))
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./ads.db")
\ No newline at end of file
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+ADS_LIST_CACHE_SIZE = int(os.getenv("ADS_LIST_CACHE_SIZE", 256))
+ADS_LIST_CACHE_TTL = float(os.getenv("ADS_LIST_CACHE_TTL", 300))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(os.cpu_count() or 1, 4)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+LAZY_HANDLERS = os.getenv("LAZY_HANDLERS", "True").lower() == "true"
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", 128))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", 64))
+ADMISSION_AUTH_LIMIT = int(os.getenv("ADMISSION_AUTH_LIMIT", 16))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 256))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 1.0))
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./ads.db")
+DATABASE_PATH = os.getenv("DATABASE_PATH", DATABASE_URL.split(":///", 1)[-1])
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 4))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -16000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+WRITE_BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_WINDOW_MS", 1))
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", 64))
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))
+MIGRATION_BATCH_PAUSE_MS = float(os.getenv("MIGRATION_BATCH_PAUSE_MS", 10))
+ADS_LOAD_MAX_BATCH = int(os.getenv("ADS_LOAD_MAX_BATCH", 256))
+ADS_PAGE_DEFAULT_LIMIT = int(os.getenv("ADS_PAGE_DEFAULT_LIMIT", 20))
+ADS_PAGE_MAX_LIMIT = int(os.getenv("ADS_PAGE_MAX_LIMIT", 100))
+ADS_LOOKUP_MAX_IDS = int(os.getenv("ADS_LOOKUP_MAX_IDS", 300))
+ADS_BULK_MAX_ITEMS = int(os.getenv("ADS_BULK_MAX_ITEMS", 5000))
+ADS_BULK_MAX_BODY_SIZE = int(os.getenv("ADS_BULK_MAX_BODY_SIZE", 16 * 1024 * 1024))
+ADS_EXPORT_BATCH_SIZE = int(os.getenv("ADS_EXPORT_BATCH_SIZE", 1000))
+ADS_EXPORT_MAX_CONCURRENT = int(os.getenv("ADS_EXPORT_MAX_CONCURRENT", 4))
@@ -1,192 +1,522 @@
+import asyncio
+import re
 import sqlite3
 import aiosqlite
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 import logging
 
+from .config import (
+    DATABASE_PATH,
+    DB_READ_POOL_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    WRITE_BATCH_WINDOW_MS,
+    WRITE_BATCH_MAX_SIZE,
+    ADS_LOAD_MAX_BATCH,
+)
+from .write_batcher import WriteBatcher
+from .migrations import CREATED_AT_SECONDS, CREATED_TS, migrate, pending_backfills, run_backfills
+from .cache import ads_list_cache, BatchLoader
+from .models import User
+from .metrics import Collector, timed_query, gauge_lines, counter_lines
+
 logger = logging.getLogger(__name__)
 
-_db = None
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
 
+_writer = None
+write_batcher = WriteBatcher(WRITE_BATCH_WINDOW_MS, WRITE_BATCH_MAX_SIZE)
+_readers: Optional[asyncio.Queue] = None
+_reader_connections: List[aiosqlite.Connection] = []
+_backfill_task: Optional[asyncio.Task] = None
+# Listing sort key: created_ts once its backfill is done, see _use_created_ts()
+_created_key = "created_ts"
+
+
+async def _connect(read_only: bool = False) -> aiosqlite.Connection:
+    """Open a connection and apply configured PRAGMAs"""
+    if SQLITE_SYNCHRONOUS not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS value: {SQLITE_SYNCHRONOUS}")
+
+    if read_only:
+        uri = Path(DATABASE_PATH).absolute().as_uri() + "?mode=ro"
+        db = await aiosqlite.connect(uri, uri=True)
+    else:
+        db = await aiosqlite.connect(DATABASE_PATH, isolation_level=None)
+        await db.execute("PRAGMA journal_mode = WAL")
+
+    await db.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    await db.execute(f"PRAGMA cache_size = {int(SQLITE_CACHE_SIZE)}")
+    await db.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+    await db.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    return db
 
-async def init_db(app=None):
-    """Initialize database connection and create tables"""
-    global _db
 
+@asynccontextmanager
+async def _reader() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a read-only connection from the pool"""
+    if _readers is None:
+        raise RuntimeError("Database not initialized")
+
+    db = await _readers.get()
     try:
-        _db = await aiosqlite.connect("ads.db")
-        await _db.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                username TEXT NOT NULL,
-                hashed_password TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        await _db.execute("""
-            CREATE TABLE IF NOT EXISTS ads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                owner_id INTEGER NOT NULL,
-                FOREIGN KEY (owner_id) REFERENCES users (id)
-            )
-        """)
+        yield db
+    finally:
+        _readers.put_nowait(db)
+
 
-        await _db.execute("CREATE INDEX IF NOT EXISTS idx_ads_owner ON ads(owner_id)")
-        await _db.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
+async def init_db(app=None):
+    """Open writer and reader connections and migrate the schema"""
+    global _writer, _readers, _backfill_task
 
-        await _db.commit()
-        logger.info("<Database initialized successfully>")
+    try:
+        _writer = await _connect()
+        await migrate(_writer)
+        await write_batcher.start(_writer)
+        pending = await pending_backfills(_writer)
+        _use_created_ts(CREATED_TS.version not in pending)
+        if pending:
+            _backfill_task = asyncio.create_task(_run_backfills())
+
+        _readers = asyncio.Queue()
+        for _ in range(max(DB_READ_POOL_SIZE, 1)):
+            db = await _connect(read_only=True)
+            _reader_connections.append(db)
+            _readers.put_nowait(db)
+
+        logger.info(f"<Database initialized successfully with {len(_reader_connections)} readers>")
 
     except Exception as e:
         logger.error(f"<Database initialization failed: {e}>")
+        await close_db()
         raise
 
 
+async def prepare_db() -> None:
+    """Apply pending migrations once, e.g. in the supervisor before workers start"""
+    db = await _connect()
+    try:
+        await migrate(db)
+    finally:
+        await db.close()
+
+
+def _use_created_ts(done: bool) -> None:
+    global _created_key
+    # Until every row has created_ts, listings order by the same value computed from created_at
+    _created_key = "created_ts" if done else f"COALESCE(created_ts, {CREATED_AT_SECONDS})"
+
+
+async def _run_backfills() -> None:
+    try:
+        await run_backfills(write_batcher.submit)
+        async with _reader() as db:
+            _use_created_ts(CREATED_TS.version not in await pending_backfills(db))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Progress is committed per batch, so the next start resumes from here
+        logger.error(f"<Schema backfill failed: {e}>")
+
+
 async def close_db(app=None):
-    """Close database connection"""
-    global _db
-    if _db:
-        await _db.close()
-        _db = None
+    """Close reader and writer connections"""
+    global _writer, _readers, _backfill_task
+    if _backfill_task is not None:
+        _backfill_task.cancel()
+        try:
+            await _backfill_task
+        except asyncio.CancelledError:
+            pass
+        _backfill_task = None
+    await write_batcher.stop()
+    while _reader_connections:
+        await _reader_connections.pop().close()
+    _readers = None
+
+    if _writer:
+        await _writer.close()
+        _writer = None
         logger.info("<Database connection closed>")
 
-async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    """Get user by email"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
-
-    cursor = await _db.execute(
-        "SELECT id, email, username, hashed_password, created_at FROM users WHERE email = ?",
-        (email,)
-    )
-    row = await cursor.fetchone()
-    await cursor.close()
+@timed_query
+async def get_user_by_email(email: str) -> Optional[User]:
+    """Get user by normalized email"""
+    async with _reader() as db:
+        cursor = await db.execute(
+            "SELECT id, email, username, hashed_password, created_at FROM users WHERE lower(email) = ?",
+            (email,)
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
 
     if row:
-        return {
-            "id": row[0],
-            "email": row[1],
-            "username": row[2],
-            "hashed_password": row[3],
-            "created_at": row[4]
-        }
+        return User(*row)
     return None
 
 
-async def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+@timed_query
+async def get_user_by_id(user_id: int) -> Optional[User]:
     """Get user by ID"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
-
-    cursor = await _db.execute(
-        "SELECT id, email, username, hashed_password, created_at FROM users WHERE id = ?",
-        (user_id,)
-    )
-    row = await cursor.fetchone()
-    await cursor.close()
+    async with _reader() as db:
+        cursor = await db.execute(
+            "SELECT id, email, username, hashed_password, created_at FROM users WHERE id = ?",
+            (user_id,)
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
 
     if row:
-        return {
-            "id": row[0],
-            "email": row[1],
-            "username": row[2],
-            "hashed_password": row[3],
-            "created_at": row[4]
-        }
+        return User(*row)
     return None
 
 
+class EmailAlreadyRegistered(Exception):
+    """Raised when a sign-up hits the unique email constraint"""
+
+
+@timed_query
 async def create_user(user_data: Dict[str, Any]) -> int:
-    """Create a new user"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
+    """Create a new user, raise EmailAlreadyRegistered if the email is taken"""
+    async def insert(db):
+        cursor = await db.execute(
+            """INSERT INTO users (email, username, hashed_password, created_at) 
+               VALUES (?, ?, ?, ?)""",
+            (user_data['email'], user_data['username'],
+             user_data['hashed_password'], user_data.get('created_at', datetime.utcnow()))
+        )
+        user_id = cursor.lastrowid
+        await cursor.close()
+        return user_id
 
-    cursor = await _db.execute(
-        """INSERT INTO users (email, username, hashed_password, created_at) 
-           VALUES (?, ?, ?, ?)""",
-        (user_data['email'], user_data['username'],
-         user_data['hashed_password'], user_data.get('created_at', datetime.utcnow()))
-    )
-    await _db.commit()
-    user_id = cursor.lastrowid
-    await cursor.close()
+    try:
+        return await write_batcher.submit(insert)
+    except sqlite3.IntegrityError as e:
+        # users.email is the only unique column besides the primary key
+        raise EmailAlreadyRegistered() from e
+
+
+def _epoch(value: Any) -> int:
+    """Unix seconds stored in ads.created_ts; naive datetimes are UTC"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+# What reads show as created_at: rows the created_ts backfill has not reached
+# yet keep their stored text until it bumps their version
+_CREATED_AT = "COALESCE(created_ts, created_at)"
+
+
+def _iso(created_at: Any) -> Any:
+    if isinstance(created_at, int):
+        return datetime.utcfromtimestamp(created_at).isoformat()
+    return created_at
 
-    return user_id
 
+def _ad(row: tuple) -> Dict[str, Any]:
+    # Ads are encoded straight away, and the JSON encoders write dicts faster than
+    # any record type, so these stay dicts; records are for rows that are held
+    return {
+        "id": row[0],
+        "title": row[1],
+        "description": row[2],
+        "created_at": _iso(row[3]),
+        "owner_id": row[4]
+    }
+
+
+def _ads_changed() -> None:
+    # Reads started before the write committed must not be shared with later callers
+    ads_list_cache.clear()
+    ad_loader.clear()
+
+
+async def _bump_ads_counter(db: aiosqlite.Connection) -> None:
+    await db.execute("UPDATE change_counters SET value = value + 1 WHERE name = 'ads'")
+
+
+@timed_query
+async def get_ads_change_counter() -> int:
+    """Get the counter bumped by every change to the ads table"""
+    async with _reader() as db:
+        cursor = await db.execute("SELECT value FROM change_counters WHERE name = 'ads'")
+        row = await cursor.fetchone()
+        await cursor.close()
+
+    return row[0] if row else 0
+
+
+@timed_query
 async def create_ad(ad_data: Dict[str, Any]) -> int:
     """Create a new ad"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
+    async def insert(db):
+        cursor = await db.execute(
+            """INSERT INTO ads (title, description, created_ts, owner_id) 
+               VALUES (?, ?, ?, ?)""",
+            (ad_data['title'], ad_data.get('description', ''),
+             _epoch(ad_data.get('created_at', datetime.utcnow())), ad_data['owner_id'])
+        )
+        ad_id = cursor.lastrowid
+        await cursor.close()
+        await _bump_ads_counter(db)
+        return ad_id
+
+    ad_id = await write_batcher.submit(insert)
+    _ads_changed()
+    return ad_id
 
-    cursor = await _db.execute(
-        """INSERT INTO ads (title, description, created_at, owner_id) 
-           VALUES (?, ?, ?, ?)""",
+
+@timed_query
+async def create_ads(ads_data: List[Dict[str, Any]]) -> List[int]:
+    """Create many ads in one transaction, return their ids in order"""
+    if not ads_data:
+        return []
+
+    now = datetime.utcnow()
+    params = [
         (ad_data['title'], ad_data.get('description', ''),
-         ad_data.get('created_at', datetime.utcnow()), ad_data['owner_id'])
+         _epoch(ad_data.get('created_at', now)), ad_data['owner_id'])
+        for ad_data in ads_data
+    ]
+
+    async def insert(db):
+        await db.executemany(
+            """INSERT INTO ads (title, description, created_ts, owner_id) 
+               VALUES (?, ?, ?, ?)""",
+            params
+        )
+        cursor = await db.execute("SELECT last_insert_rowid()")
+        row = await cursor.fetchone()
+        await cursor.close()
+        await _bump_ads_counter(db)
+        # Rows inserted by one statement on the single writer get consecutive ids
+        first_id = row[0] - len(params) + 1
+        return list(range(first_id, row[0] + 1))
+
+    ad_ids = await write_batcher.submit(insert)
+    _ads_changed()
+    return ad_ids
+
+
+@timed_query
+async def get_ads_by_ids(ad_ids: List[int]) -> Dict[int, Tuple[Dict[str, Any], int]]:
+    """Get (ad, version) pairs by ID with one query, keyed by ID; missing IDs are left out"""
+    if not ad_ids:
+        return {}
+    placeholders = ', '.join('?' * len(ad_ids))
+    async with _reader() as db:
+        cursor = await db.execute(
+            f"SELECT id, title, description, {_CREATED_AT}, owner_id, version FROM ads WHERE id IN ({placeholders})",
+            ad_ids
+        )
+        rows = await cursor.fetchall()
+        await cursor.close()
+
+    # The version comes from the same row, so an ETag built from it always matches the ad
+    return {row[0]: (_ad(row), row[5]) for row in rows}
+
+
+# Concurrent get_ad() calls share one query per id, and ids requested
+# in the same loop iteration are read together by get_ads_by_ids()
+ad_loader = BatchLoader(get_ads_by_ids, ADS_LOAD_MAX_BATCH)
+
+
+async def get_ad(ad_id: int) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Get ad by ID as (ad, version)"""
+    return await ad_loader.load(ad_id)
+
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """Smallest string above every string starting with prefix, None if there is none"""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+def build_ads_page_query(
+    limit: int,
+    after: Optional[Tuple[int, int]] = None,
+    owner_id: Optional[int] = None,
+    created_after: Optional[int] = None,
+    created_before: Optional[int] = None,
+    title_prefix: Optional[str] = None,
+    newest_first: bool = True,
+    created_key: str = "created_ts"
+) -> Tuple[str, List[Any]]:
+    """SQL and parameters for one page of a filtered ads listing, ordered by created_key"""
+    conditions = []
+    params: List[Any] = []
+    if owner_id is not None:
+        conditions.append("owner_id = ?")
+        params.append(owner_id)
+    if created_after is not None:
+        conditions.append(f"{created_key} > ?")
+        params.append(created_after)
+    if created_before is not None:
+        conditions.append(f"{created_key} < ?")
+        params.append(created_before)
+    if title_prefix:
+        # A range instead of LIKE, so the BINARY index on title can serve it
+        conditions.append("title >= ?")
+        params.append(title_prefix)
+        end = _prefix_end(title_prefix)
+        if end is not None:
+            conditions.append("title < ?")
+            params.append(end)
+    if after is not None:
+        conditions.append(f"({created_key}, id) {'<' if newest_first else '>'} (?, ?)")
+        params += after
+
+    direction = "DESC" if newest_first else "ASC"
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit + 1)
+    return (
+        f"""SELECT id, title, description, {_CREATED_AT}, owner_id, {created_key} FROM ads {where}
+            ORDER BY {created_key} {direction}, id {direction} LIMIT ?""",
+        params
     )
-    await _db.commit()
-    ad_id = cursor.lastrowid
-    await cursor.close()
 
-    return ad_id
 
+@timed_query
+async def get_ads_page(
+    limit: int, after: Optional[Tuple[int, int]] = None, **filters
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """Get one page of ads matching filters (see build_ads_page_query), starting after (created_ts, id)"""
+    query, params = build_ads_page_query(limit, after, created_key=_created_key, **filters)
+    async with _reader() as db:
+        cursor = await db.execute(query, params)
+        rows = await cursor.fetchall()
+        await cursor.close()
+
+    ads = [_ad(row) for row in rows[:limit]]
+    next_after = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_after = (last[5], last[0])
+
+    return ads, next_after
+
+
+_SEARCH_TOKEN = re.compile(r'\w+\*?')
+
+# bm25 column weights: a match in the title counts more than in the description
+_SEARCH_RANK = "bm25(ads_fts, 10.0, 1.0)"
+
+
+def build_search_query(text: str) -> Optional[str]:
+    """Turn user input into an FTS5 query: all terms required, 'term*' is a prefix"""
+    terms = []
+    for token in _SEARCH_TOKEN.findall(text):
+        if token.endswith('*'):
+            terms.append(f'"{token[:-1]}"*')
+        else:
+            terms.append(f'"{token}"')
+    return ' '.join(terms) or None
+
+
+@timed_query
+async def search_ads(
+    query: str, limit: int, after: Optional[Tuple[float, int]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, int]]]:
+    """Full-text search over ads, best bm25 match first"""
+    async with _reader() as db:
+        if after is None:
+            cursor = await db.execute(
+                f"""SELECT rowid, {_SEARCH_RANK} AS score FROM ads_fts
+                    WHERE ads_fts MATCH ?
+                    ORDER BY score, rowid LIMIT ?""",
+                (query, limit + 1)
+            )
+        else:
+            cursor = await db.execute(
+                f"""SELECT rowid, {_SEARCH_RANK} AS score FROM ads_fts
+                    WHERE ads_fts MATCH ? AND ({_SEARCH_RANK}, rowid) > (?, ?)
+                    ORDER BY score, rowid LIMIT ?""",
+                (query, after[0], after[1], limit + 1)
+            )
+        ranked = await cursor.fetchall()
+        await cursor.close()
+
+        page = ranked[:limit]
+        rows = {}
+        if page:
+            # Snippets and rows are fetched only for the page, not for every match
+            placeholders = ', '.join('?' * len(page))
+            ids = [row[0] for row in page]
+            cursor = await db.execute(
+                f"""SELECT a.id, a.title, a.description, COALESCE(a.created_ts, a.created_at), a.owner_id,
+                           snippet(ads_fts, -1, '<mark>', '</mark>', '…', 12)
+                    FROM ads_fts JOIN ads a ON a.id = ads_fts.rowid
+                    WHERE ads_fts MATCH ? AND ads_fts.rowid IN ({placeholders})""",
+                (query, *ids)
+            )
+            for row in await cursor.fetchall():
+                hit = _ad(row)
+                hit["snippet"] = row[5]
+                rows[row[0]] = hit
+            await cursor.close()
 
-async def get_ad(ad_id: int) -> Optional[Dict[str, Any]]:
-    """Get ad by ID"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
+    ads = [rows[ad_id] for ad_id, _ in page if ad_id in rows]
+    next_after = None
+    if len(ranked) > limit:
+        next_after = (page[-1][1], page[-1][0])
 
-    cursor = await _db.execute(
-        "SELECT id, title, description, created_at, owner_id FROM ads WHERE id = ?",
-        (ad_id,)
-    )
-    row = await cursor.fetchone()
-    await cursor.close()
+    return ads, next_after
 
-    if row:
-        return {
-            "id": row[0],
-            "title": row[1],
-            "description": row[2],
-            "created_at": row[3],
-            "owner_id": row[4]
-        }
-    return None
 
+async def iter_ads(batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Iterate over all ads in id order, batch_size rows at a time"""
+    # A slow client must not hold a pooled reader or one long read transaction,
+    # so exports get their own connection and read each batch as a separate query
+    db = await _connect(read_only=True)
+    try:
+        last_id = 0
+        while True:
+            cursor = await db.execute(
+                f"""SELECT id, title, description, {_CREATED_AT}, owner_id FROM ads
+                   WHERE id > ? ORDER BY id LIMIT ?""",
+                (last_id, batch_size)
+            )
+            rows = await cursor.fetchall()
+            await cursor.close()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            yield [_ad(row) for row in rows]
+    finally:
+        await db.close()
 
-async def get_all_ads() -> List[Dict[str, Any]]:
-    """Get all ads"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
 
-    cursor = await _db.execute(
-        "SELECT id, title, description, created_at, owner_id FROM ads ORDER BY created_at DESC"
-    )
-    rows = await cursor.fetchall()
-    await cursor.close()
+class AdNotFound(Exception):
+    """Raised when a mutated ad does not exist"""
 
-    return [
-        {
-            "id": row[0],
-            "title": row[1],
-            "description": row[2],
-            "created_at": row[3],
-            "owner_id": row[4]
-        }
-        for row in rows
-    ]
 
+class NotAdOwner(Exception):
+    """Raised when a user mutates an ad they do not own"""
+
+
+async def _ownership_error(db: aiosqlite.Connection, ad_id: int) -> Exception:
+    # Only reached when the guarded statement matched nothing, i.e. never on success
+    cursor = await db.execute("SELECT 1 FROM ads WHERE id = ?", (ad_id,))
+    exists = await cursor.fetchone() is not None
+    await cursor.close()
+    return NotAdOwner() if exists else AdNotFound()
 
-async def update_ad(ad_id: int, update_data: Dict[str, Any]) -> None:
-    """Update ad"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
 
+@timed_query
+async def update_ad(ad_id: int, owner_id: int, update_data: Dict[str, Any]) -> int:
+    """Update an ad owned by owner_id, return its new version"""
     set_clauses = []
     params = []
 
@@ -194,17 +524,62 @@ async def update_ad(ad_id: int, update_data: Dict[str, Any]) -> None:
         set_clauses.append(f"{key} = ?")
         params.append(value)
 
-    params.append(ad_id)
-
-    query = f"UPDATE ads SET {', '.join(set_clauses)} WHERE id = ?"
-    await _db.execute(query, params)
-    await _db.commit()
-
-
-async def delete_ad(ad_id: int) -> None:
-    """Delete ad"""
-    if not _db:
-        raise RuntimeError("Database not initialized")
-
-    await _db.execute("DELETE FROM ads WHERE id = ?", (ad_id,))
-    await _db.commit()
\ No newline at end of file
+    set_clauses.append("version = version + 1")
+    params += [ad_id, owner_id]
+
+    query = f"UPDATE ads SET {', '.join(set_clauses)} WHERE id = ? AND owner_id = ? RETURNING version"
+
+    async def update(db):
+        cursor = await db.execute(query, params)
+        row = await cursor.fetchone()
+        await cursor.close()
+        if row is None:
+            raise await _ownership_error(db, ad_id)
+        await _bump_ads_counter(db)
+        return row[0]
+
+    version = await write_batcher.submit(update)
+    _ads_changed()
+    return version
+
+
+@timed_query
+async def delete_ad(ad_id: int, owner_id: int) -> None:
+    """Delete an ad owned by owner_id"""
+    async def delete(db):
+        cursor = await db.execute(
+            "DELETE FROM ads WHERE id = ? AND owner_id = ? RETURNING id", (ad_id, owner_id)
+        )
+        row = await cursor.fetchone()
+        await cursor.close()
+        if row is None:
+            raise await _ownership_error(db, ad_id)
+        await _bump_ads_counter(db)
+
+    await write_batcher.submit(delete)
+    _ads_changed()
+
+
+def _collect_metrics():
+    stats = write_batcher.stats()
+    lines = ["# HELP write_batch_size Writes committed together by the write batcher",
+             "# TYPE write_batch_size histogram"]
+    cumulative = 0
+    for bound, count in stats["batch_size_buckets"].items():
+        cumulative += count
+        lines.append(f'write_batch_size_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f"write_batch_size_sum {stats['writes']}")
+    lines.append(f"write_batch_size_count {stats['batches']}")
+    loader = ad_loader.stats()
+    lines += counter_lines("ad_loader_loads_total", "get_ad() calls that started a load",
+                           {"": loader["loads"]})
+    lines += counter_lines("ad_loader_shared_total", "get_ad() calls that joined a load in flight",
+                           {"": loader["shared"]})
+    lines += counter_lines("ad_loader_batches_total", "Batched queries run for get_ad()",
+                           {"": loader["batches"]})
+    lines += gauge_lines("db_readers_available", "Idle connections in the reader pool",
+                         {"": _readers.qsize() if _readers is not None else 0})
+    return lines
+
+
+Collector(_collect_metrics)
@@ -0,0 +1,214 @@
+import asyncio
+import functools
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from aiohttp import web
+
+from .config import LOOP_LAG_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, total in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(total)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    """Histogram with fixed buckets and optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+        REGISTRY.append(self)
+
+    def labels(self, *labelvalues: str) -> _HistogramChild:
+        """Child for one label combination; keep it around on hot paths"""
+        child = self._children.get(labelvalues)
+        if child is None:
+            child = self._children[labelvalues] = _HistogramChild(self.buckets)
+        return child
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        child = self._children.get(labelvalues)
+        if child is None:
+            child = self.labels(*labelvalues)
+        child.counts[bisect_left(child.buckets, value)] += 1
+        child.sum += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}")
+        return lines
+
+
+class Collector:
+    """Metrics read from a callback at scrape time"""
+
+    def __init__(self, func: Callable[[], Iterable[str]]):
+        self.func = func
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return list(self.func())
+
+
+REGISTRY: List = []
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        try:
+            lines.extend(metric.render())
+        except Exception as e:
+            logger.error(f"<Failed to collect metrics: {e}>")
+    return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, documentation: str, samples: Dict[str, float], label: str = "") -> List[str]:
+    """Format gauge samples keyed by a single label value ('' for no label)"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for value, number in samples.items():
+        labels = _labels((label,), (value,)) if label else ""
+        lines.append(f"{name}{labels} {_number(number)}")
+    return lines
+
+
+def counter_lines(name: str, documentation: str, samples: Dict[str, float], label: str = "") -> List[str]:
+    """Format counter samples keyed by a single label value ('' for no label)"""
+    lines = gauge_lines(name, documentation, samples, label)
+    lines[1] = f"# TYPE {name} counter"
+    return lines
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "Database call latency by function", ("function",)
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds", "Time to hash or verify a password, including queueing",
+    ("operation",), buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0)
+)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled loop wakeup and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+def timed_query(func):
+    """Record the latency of a database coroutine function"""
+    child = db_query_duration_seconds.labels(func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+async def _monitor_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    child = event_loop_lag_seconds.labels()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        child.observe(max(loop.time() - expected, 0.0))
+
+
+LOOP_LAG_MONITOR = web.AppKey("loop_lag_monitor", asyncio.Task)
+
+
+async def start_loop_lag_monitor(app):
+    """Start sampling event-loop lag"""
+    app[LOOP_LAG_MONITOR] = asyncio.create_task(_monitor_loop_lag(LOOP_LAG_INTERVAL))
+
+
+async def stop_loop_lag_monitor(app):
+    """Stop sampling event-loop lag"""
+    task = app.get(LOOP_LAG_MONITOR)
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
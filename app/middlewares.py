@@ -1,7 +1,14 @@
-import jwt
+import hashlib
+import time
 from aiohttp import web
 from datetime import datetime
 from .database import get_user_by_id
+from .cache import user_cache, token_cache
+from .serialization import json_response
+from .metrics import http_requests_total, http_request_duration_seconds
+from .admission import (
+    Overloaded, limiters, route_class, admission_queue_seconds, admission_rejected_total
+)
 from .config import SECRET_KEY, ALGORITHM
 
 
@@ -13,14 +20,17 @@ async def auth_middleware(request, handler):
         '/api/auth/register',
         '/api/auth/login',
         '/health',
-        '/',
-        '/api/ads'
+        '/metrics',
+        '/'
     ]
 
+    if request.method == 'OPTIONS':
+        return await handler(request)
+
     if request.path.startswith('/api/ads') and request.method == 'GET':
         return await handler(request)
 
-    if any(request.path.startswith(path) for path in public_paths):
+    if request.path in public_paths:
         return await handler(request)
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -28,27 +38,36 @@ async def auth_middleware(request, handler):
 
     token = auth_header.split(' ')[1]
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(token_key)
+    if payload is None:
+        import jwt
 
-        if not user_id:
-            raise web.HTTPUnauthorized(reason="Invalid token payload")
-        expire = payload.get("exp")
-        if expire is None or datetime.utcnow() > datetime.fromtimestamp(expire):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
             raise web.HTTPUnauthorized(reason="Token expired")
+        except jwt.InvalidTokenError:
+            raise web.HTTPUnauthorized(reason="Invalid token")
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            token_cache.set(token_key, payload, ttl=ttl)
+
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise web.HTTPUnauthorized(reason="Invalid token payload")
+    expire = payload.get("exp")
+    if expire is None or datetime.utcnow() > datetime.utcfromtimestamp(expire):
+        raise web.HTTPUnauthorized(reason="Token expired")
+
+    user = user_cache.get(user_id)
+    if user is None:
         user = await get_user_by_id(user_id)
         if not user:
             raise web.HTTPUnauthorized(reason="User not found")
-        request['user'] = user
-        return await handler(request)
-
-    except jwt.ExpiredSignatureError:
-        raise web.HTTPUnauthorized(reason="Token expired")
-    except jwt.InvalidTokenError:
-        raise web.HTTPUnauthorized(reason="Invalid token")
-    except Exception as e:
-        raise web.HTTPInternalServerError(reason=str(e))
+        user_cache.set(user_id, user)
+    request['user'] = user
+    return await handler(request)
 
 
 @web.middleware
@@ -58,18 +77,65 @@ async def error_middleware(request, handler):
         response = await handler(request)
         return response
     except web.HTTPException as ex:
-        return web.json_response(
+        return json_response(
             {"error": ex.reason},
             status=ex.status
         )
     except Exception as ex:
-        return web.json_response(
+        return json_response(
             {"error": "Internal server error"},
             status=500
         )
 
 
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Record request count and latency per route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as ex:
+        status = ex.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "unmatched"
+        http_request_duration_seconds.observe(time.perf_counter() - start, request.method, route)
+        http_requests_total.inc(request.method, route, str(status))
+
+
+@web.middleware
+async def admission_middleware(request, handler):
+    """Shed load: cap requests in flight per route class, queue briefly, then 503"""
+    if request.path in ('/health', '/metrics'):
+        return await handler(request)
+
+    name = route_class(request)
+    limiter = limiters[name]
+    start = time.perf_counter()
+    try:
+        await limiter.acquire()
+    except Overloaded as e:
+        admission_rejected_total.inc(name, e.reason)
+        return json_response(
+            {"error": "Service is busy, try again later"},
+            status=503,
+            headers={"Retry-After": "1"}
+        )
+    admission_queue_seconds.observe(time.perf_counter() - start, name)
+
+    try:
+        return await handler(request)
+    finally:
+        limiter.release()
+
+
 def setup_middlewares(app):
     """Setup all middlewares"""
+    app.middlewares.append(metrics_middleware)
+    app.middlewares.append(admission_middleware)
     app.middlewares.append(error_middleware)
     app.middlewares.append(auth_middleware)
\ No newline at end of file
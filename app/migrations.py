@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+import aiosqlite
+
+from .config import MIGRATION_BATCH_SIZE, MIGRATION_BATCH_PAUSE_MS
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[aiosqlite.Connection], Awaitable[None]]
+BatchStep = Callable[[aiosqlite.Connection, int, int], Awaitable[Optional[int]]]
+Submit = Callable[[Callable[[aiosqlite.Connection], Awaitable[Any]]], Awaitable[Any]]
+
+
+class Migration:
+    """One schema version.
+
+    apply(db) runs in one transaction together with the user_version bump.
+    backfill(db, after_id, batch_size), if given, is a heavy data change run
+    online afterwards, one small transaction per batch; it returns the last
+    id it handled, or None once nothing is left.
+    """
+
+    def __init__(self, version: int, name: str, apply: Step, backfill: Optional[BatchStep] = None):
+        self.version = version
+        self.name = name
+        self.apply = apply
+        self.backfill = backfill
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version!r}, {self.name!r})"
+
+
+async def _baseline(db: aiosqlite.Connection) -> None:
+    # IF NOT EXISTS adopts databases created before migrations were tracked
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            username TEXT NOT NULL,
+            hashed_password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS ads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            owner_id INTEGER NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (owner_id) REFERENCES users (id)
+        )
+    """)
+
+    cursor = await db.execute("PRAGMA table_info(ads)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    await cursor.close()
+    if "version" not in columns:
+        await db.execute("ALTER TABLE ads ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    await db.execute("INSERT OR IGNORE INTO change_counters (name, value) VALUES ('ads', 0)")
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+    """)
+
+
+async def _ads_indexes(db: aiosqlite.Connection) -> None:
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_ads_owner ON ads(owner_id)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_ads_created_at_id ON ads(created_at, id)")
+
+
+async def _email_index(db: aiosqlite.Connection) -> None:
+    """Case-insensitive unique email index used by lookups and sign-up"""
+    # The UNIQUE constraint on users.email already provides an index on the raw column
+    await db.execute("DROP INDEX IF EXISTS idx_users_email")
+    await db.execute("SAVEPOINT email_index")
+    try:
+        await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email))")
+    except sqlite3.IntegrityError:
+        # Accounts created before emails were normalized may differ only in case
+        await db.execute("ROLLBACK TO email_index")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users(lower(email))")
+        logger.warning("<Users with emails differing only in case exist, email index is not unique>")
+    await db.execute("RELEASE email_index")
+
+
+async def _search(db: aiosqlite.Connection) -> None:
+    """Create the FTS5 index over ads and the triggers that keep it in sync"""
+    cursor = await db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ads_fts'"
+    )
+    exists = await cursor.fetchone() is not None
+    await cursor.close()
+
+    await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS ads_fts USING fts5(
+            title, description,
+            content='ads', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS ads_fts_ai AFTER INSERT ON ads BEGIN
+            INSERT INTO ads_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS ads_fts_ad AFTER DELETE ON ads BEGIN
+            INSERT INTO ads_fts(ads_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS ads_fts_au AFTER UPDATE OF title, description ON ads BEGIN
+            INSERT INTO ads_fts(ads_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO ads_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """)
+
+    if not exists:
+        # FTS5 has no incremental build that stays consistent with the triggers,
+        # so this one runs in the migration transaction
+        await db.execute("INSERT INTO ads_fts(ads_fts) VALUES ('rebuild')")
+        logger.info("<Full-text index built>")
+
+
+async def _created_ts(db: aiosqlite.Connection) -> None:
+    """Add ads.created_ts, Unix seconds, filled from created_at by _fill_created_ts"""
+    await db.execute("ALTER TABLE ads ADD COLUMN created_ts INTEGER")
+
+
+# SQLite sorts all text above all integers, so created_at text cannot be
+# rewritten in place batch by batch; rows are ordered by this until created_ts
+# is filled. created_at text that strftime() cannot parse counts as 0.
+CREATED_AT_SECONDS = "COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0)"
+
+
+async def _fill_created_ts(db: aiosqlite.Connection, after_id: int, batch_size: int) -> Optional[int]:
+    cursor = await db.execute(
+        "SELECT max(id) FROM (SELECT id FROM ads WHERE id > ? ORDER BY id LIMIT ?)", (after_id, batch_size)
+    )
+    last_id = (await cursor.fetchone())[0]
+    await cursor.close()
+    if last_id is None:
+        return None
+    # Reads show created_ts instead of the stored text once it is set, so the
+    # version and the listing counter move with it and cached ETags stop matching
+    cursor = await db.execute(f"""
+        UPDATE ads SET created_ts = {CREATED_AT_SECONDS}, version = version + 1
+        WHERE id > ? AND id <= ? AND created_ts IS NULL
+    """, (after_id, last_id))
+    if cursor.rowcount > 0:
+        await db.execute("UPDATE change_counters SET value = value + 1 WHERE name = 'ads'")
+    await cursor.close()
+    return last_id
+
+
+async def _created_ts_index(db: aiosqlite.Connection) -> None:
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_ads_created_ts_id ON ads(created_ts, id)")
+    # Listings no longer order by created_at
+    await db.execute("DROP INDEX IF EXISTS idx_ads_created_at_id")
+
+
+async def _owner_created_ts_index(db: aiosqlite.Connection) -> None:
+    # Serves owner_id filters alone and with a created_ts range or order, so it replaces idx_ads_owner
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_ads_owner_created_ts ON ads(owner_id, created_ts)")
+    await db.execute("DROP INDEX IF EXISTS idx_ads_owner")
+
+
+async def _title_index(db: aiosqlite.Connection) -> None:
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_ads_title ON ads(title)")
+
+
+# Reads switch from CREATED_AT_SECONDS to created_ts once this backfill is done
+CREATED_TS = Migration(5, "created_ts", _created_ts, _fill_created_ts)
+
+# Append only: a released version must never change, since databases record
+# the last one they applied. Each index build is its own step, so the write
+# lock is held for one build at a time, and only on the boot that needs it.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "ads_indexes", _ads_indexes),
+    Migration(3, "email_index", _email_index),
+    Migration(4, "search", _search),
+    CREATED_TS,
+    Migration(6, "created_ts_index", _created_ts_index),
+    Migration(7, "owner_created_ts_index", _owner_created_ts_index),
+    Migration(8, "title_index", _title_index),
+]
+
+
+async def schema_version(db: aiosqlite.Connection) -> int:
+    """Last migration applied to the database"""
+    cursor = await db.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    await cursor.close()
+    return row[0]
+
+
+async def migrate(db: aiosqlite.Connection, migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    """Apply pending migrations, each atomically with its user_version bump"""
+    latest = migrations[-1].version if migrations else 0
+    current = await schema_version(db)
+    if current > latest:
+        raise RuntimeError(f"Database schema version {current} is newer than this code ({latest})")
+
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+        # IMMEDIATE takes the write lock up front, so processes starting
+        # together apply each step once: the others see the new version
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            current = await schema_version(db)
+            if migration.version <= current:
+                await db.execute("COMMIT")
+                continue
+            start = time.perf_counter()
+            await migration.apply(db)
+            if migration.backfill is not None:
+                await db.execute(
+                    "INSERT OR REPLACE INTO schema_backfills (version, last_id) VALUES (?, 0)",
+                    (migration.version,)
+                )
+            await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+            await db.execute("COMMIT")
+        except Exception:
+            await db.execute("ROLLBACK")
+            raise
+        current = migration.version
+        logger.info(
+            f"<Applied migration {migration.version} ({migration.name}) in {time.perf_counter() - start:.3f}s>"
+        )
+
+    return current
+
+
+async def pending_backfills(db: aiosqlite.Connection) -> List[int]:
+    """Versions whose backfill has not finished yet"""
+    cursor = await db.execute("SELECT version FROM schema_backfills ORDER BY version")
+    versions = [row[0] for row in await cursor.fetchall()]
+    await cursor.close()
+    return versions
+
+
+async def run_backfills(
+    submit: Submit,
+    migrations: Sequence[Migration] = MIGRATIONS,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+    pause: float = MIGRATION_BATCH_PAUSE_MS / 1000
+) -> None:
+    """Run pending backfills batch by batch through submit(op), e.g. the write batcher.
+
+    Progress is committed with each batch, so a restart resumes where the
+    last run stopped, and several processes can share the work.
+    """
+    for migration in migrations:
+        if migration.backfill is None:
+            continue
+
+        async def batch(db, migration=migration):
+            cursor = await db.execute(
+                "SELECT last_id FROM schema_backfills WHERE version = ?", (migration.version,)
+            )
+            row = await cursor.fetchone()
+            await cursor.close()
+            if row is None:
+                return False
+            last_id = await migration.backfill(db, row[0], batch_size)
+            if last_id is None:
+                await db.execute("DELETE FROM schema_backfills WHERE version = ?", (migration.version,))
+                logger.info(f"<Backfill of migration {migration.version} ({migration.name}) finished>")
+                return False
+            await db.execute(
+                "UPDATE schema_backfills SET last_id = ? WHERE version = ?",
+                (last_id, migration.version)
+            )
+            return True
+
+        while await submit(batch):
+            # Let request writes in between batches
+            await asyncio.sleep(pause)
+
+
+def transaction_submit(db: aiosqlite.Connection) -> Submit:
+    """submit() for run_backfills on a plain connection: one transaction per op"""
+    async def submit(op):
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            result = await op(db)
+        except Exception:
+            await db.execute("ROLLBACK")
+            raise
+        await db.execute("COMMIT")
+        return result
+
+    return submit
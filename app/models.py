@@ -0,0 +1,29 @@
+from typing import Any, Dict
+
+
+# Records are built positionally from SELECT tuples, so __init__ argument order must
+# match the column order in app.database. __slots__ keeps each one well under half
+# the size of the equivalent dict, which matters for rows held in memory such as
+# the user cache. Rows that are only encoded and sent stay dicts (see app.database).
+
+class User:
+    __slots__ = ("id", "email", "username", "hashed_password", "created_at")
+
+    def __init__(self, id: int, email: str, username: str, hashed_password: str, created_at: Any):
+        self.id = id
+        self.email = email
+        self.username = username
+        self.hashed_password = hashed_password
+        self.created_at = created_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Public fields, without the password hash"""
+        return {
+            "id": self.id,
+            "email": self.email,
+            "username": self.username,
+            "created_at": self.created_at
+        }
+
+    def __repr__(self) -> str:
+        return f"User(id={self.id!r}, email={self.email!r})"
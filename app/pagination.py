@@ -0,0 +1,42 @@
+import base64
+import json
+import math
+from typing import Any, List, Sequence
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset position into an opaque cursor"""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _check_value(value: Any, expected: type) -> Any:
+    # bool is an int subclass, but never a valid cursor value
+    if isinstance(value, bool):
+        raise ValueError("Invalid cursor")
+    if expected is int:
+        if not isinstance(value, int) or not INT64_MIN <= value <= INT64_MAX:
+            raise ValueError("Invalid cursor")
+    elif expected is float:
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError("Invalid cursor")
+        value = float(value)
+    elif not isinstance(value, expected):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Decode opaque cursor with one value per type, raise ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    return [_check_value(value, expected) for value, expected in zip(values, types)]
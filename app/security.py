@@ -1,11 +1,103 @@
-from passlib.context import CryptContext
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from .config import PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+from .metrics import Collector, gauge_lines, password_hash_duration_seconds
+
+_pwd_context = None
+_executor: Optional[Executor] = None
+_pending = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashing jobs are already waiting"""
+
+
+def _get_context():
+    global _pwd_context
+    if _pwd_context is None:
+        # passlib is slow to import, so it is loaded by the first hash or verify
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def preload() -> None:
+    """Load the hashing backend now, e.g. in the supervisor before workers are forked"""
+    _get_context()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _get_context().hash(password)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return _executor
+
+
+def _release() -> None:
+    global _pending
+    _pending -= 1
+
+
+async def _run_in_executor(operation: str, func, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+
+    loop = asyncio.get_running_loop()
+    job = _get_executor().submit(func, *args)
+    _pending += 1
+
+    def done(_):
+        # The slot is held until the job itself finishes, even if the caller gave up waiting
+        try:
+            loop.call_soon_threadsafe(_release)
+        except RuntimeError:
+            pass
+
+    job.add_done_callback(done)
+    start = time.perf_counter()
+    try:
+        return await asyncio.wrap_future(job)
+    finally:
+        password_hash_duration_seconds.observe(time.perf_counter() - start, operation)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash without blocking the event loop"""
+    return await _run_in_executor("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash without blocking the event loop"""
+    return await _run_in_executor("hash", get_password_hash, password)
+
+
+async def shutdown_password_executor(app=None):
+    """Shut down the hashing executor"""
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        # Waiting for running jobs happens in a thread so cleanup does not block the loop
+        await asyncio.to_thread(executor.shutdown, wait=True)
+
+
+Collector(lambda: gauge_lines(
+    "password_hash_pending", "Hashing jobs running or queued", {"": _pending}
+))
@@ -0,0 +1,57 @@
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+from aiohttp import web
+
+from .config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    # Records from app.models: the dict only lives while the encoder writes it out
+    as_dict = getattr(obj, "as_dict", None)
+    if as_dict is not None:
+        return as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Built once: json.dumps(cls=...) would construct a new encoder on every call
+_encoder = json.JSONEncoder(default=_default, separators=(',', ':'))
+
+if orjson is not None and JSON_BACKEND in ("auto", "orjson"):
+    BACKEND = "orjson"
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON"""
+        return orjson.dumps(obj, default=_default)
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON string"""
+        return orjson.dumps(obj, default=_default).decode()
+else:
+    BACKEND = "json"
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON"""
+        return _encoder.encode(obj).encode()
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON string"""
+        return _encoder.encode(obj)
+
+
+def json_response(data: Any, status: int = 200, headers: Optional[dict] = None) -> web.Response:
+    """Build a JSON response with the shared encoder"""
+    return web.Response(
+        body=dumps_bytes(data),
+        status=status,
+        headers=headers,
+        content_type='application/json'
+    )
@@ -1,5 +1,12 @@
 import re
-from typing import Dict, List
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+Errors = Dict[str, List[str]]
+Validator = Callable[[Dict], Errors]
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+USERNAME_PATTERN = r'^[a-zA-Z0-9_]+$'
 
 
 class ValidationError(Exception):
@@ -8,132 +15,151 @@ class ValidationError(Exception):
         super().__init__("Validation failed")
 
 
+class Field:
+    """Declarative rules for one payload field"""
+
+    def __init__(self, name: str, required: bool = False, strip: bool = True,
+                 min_length: Optional[int] = None, max_length: Optional[int] = None,
+                 pattern: Optional[str] = None, pattern_message: Optional[str] = None,
+                 label: Optional[str] = None):
+        self.name = name
+        self.required = required
+        self.strip = strip
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern = pattern
+        self.pattern_message = pattern_message
+        self.label = label or name.capitalize()
+
+    def compile(self) -> tuple:
+        """Precompute everything the validator needs for this field"""
+        return (
+            self.name,
+            f"Field '{self.name}' is required" if self.required else None,
+            self.strip,
+            self.min_length if self.min_length is not None else 0,
+            self.max_length if self.max_length is not None else sys.maxsize,
+            f"{self.label} must be at least {self.min_length} characters long",
+            f"{self.label} must not exceed {self.max_length} characters",
+            re.compile(self.pattern).match if self.pattern is not None else None,
+            self.pattern_message,
+        )
+
+
+_MISSING = object()
+
+
+def compile_schema(fields: Sequence[Field], require_any: Sequence[str] = ()) -> Validator:
+    """Compile field rules once into a validator returning {key: [messages]}"""
+    specs = tuple(field.compile() for field in fields)
+    require_any = tuple(require_any)
+    any_message = f"At least one field ({' or '.join(require_any)}) must be provided for update"
+
+    def validate(data: Dict) -> Errors:
+        missing = None
+        invalid = None
+        for name, required, strip, min_length, max_length, too_short, too_long, match, pattern_message in specs:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                if required is not None:
+                    if missing is None:
+                        missing = []
+                    missing.append(required)
+                continue
+            # Each value is converted and stripped once for both the required and the field rules
+            text = str(value)
+            stripped = text.strip()
+            if required is not None and not stripped:
+                if missing is None:
+                    missing = []
+                missing.append(required)
+            if not value:
+                continue
+            if strip:
+                text = stripped
+            length = len(text)
+            messages = None
+            if length < min_length:
+                messages = [too_short]
+            elif length > max_length:
+                messages = [too_long]
+            if match is not None and match(text) is None:
+                if messages is None:
+                    messages = []
+                messages.append(pattern_message.format(value=text))
+            if messages is not None:
+                if invalid is None:
+                    invalid = []
+                invalid.append((name, messages))
+
+        if missing is None and invalid is None and not require_any:
+            return {}
+        errors: Errors = {}
+        if require_any and not any(name in data for name in require_any):
+            errors["general"] = [any_message]
+        if missing is not None:
+            errors["required"] = missing
+        if invalid is not None:
+            errors.update(invalid)
+        return errors
+
+    return validate
+
+
+def validate_many(validator: Validator, items: Sequence[Any]) -> List[Errors]:
+    """Validate a list of payloads, one errors dict per item ({} when valid)"""
+    return [
+        validator(item) if isinstance(item, dict) else {"general": ["Item must be a JSON object"]}
+        for item in items
+    ]
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form used to store and look up emails"""
+    return str(email).strip().casefold()
+
+
+_email_match = re.compile(EMAIL_PATTERN).match
+
+
 def validate_email_format(email: str) -> bool:
     """Simple but effective email validation"""
     if not email or not isinstance(email, str):
         return False
-
-    email = email.strip()
-
-    if '@' not in email:
-        return False
-    parts = email.split('@')
-    if len(parts) != 2:
-        return False
-
-    local_part, domain = parts
-    if not local_part or not domain:
-        return False
-    if '.' not in domain:
-        return False
-    domain_parts = domain.split('.')
-    if len(domain_parts[-1]) < 2:
-        return False
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _email_match(email.strip()) is not None
 
 
 def validate_required_fields(data: Dict, required_fields: List[str]) -> Dict[str, List[str]]:
     """Validate that all required fields are present"""
-    errors = {}
-
-    for field in required_fields:
-        if field not in data or not str(data[field]).strip():
-            if "required" not in errors:
-                errors["required"] = []
-            errors["required"].append(f"Field '{field}' is required")
-
-    return errors
-
-
-def validate_user_registration(data: Dict) -> Dict[str, List[str]]:
-    """Validate user registration data"""
-    errors = {}
-    required_errors = validate_required_fields(data, ['email', 'password', 'username'])
-    if required_errors:
-        errors.update(required_errors)
-    if 'email' in data and data['email']:
-        email = str(data['email']).strip()
-        if not validate_email_format(email):
-            if "email" not in errors:
-                errors["email"] = []
-            errors["email"].append(f"Invalid email format: '{email}'")
-    if 'password' in data and data['password']:
-        password = str(data['password'])
-        if len(password) < 8:
-            if "password" not in errors:
-                errors["password"] = []
-            errors["password"].append("Password must be at least 8 characters long")
-    if 'username' in data and data['username']:
-        username = str(data['username']).strip()
-        if len(username) < 3:
-            if "username" not in errors:
-                errors["username"] = []
-            errors["username"].append("Username must be at least 3 characters long")
-        if not re.match(r'^[a-zA-Z0-9_]+$', username):
-            if "username" not in errors:
-                errors["username"] = []
-            errors["username"].append("Username can only contain letters, numbers and underscores")
-
-    return errors
-
-
-def validate_ad_creation(data: Dict) -> Dict[str, List[str]]:
-    """Validate ad creation data"""
-    errors = {}
-    required_errors = validate_required_fields(data, ['title'])
-    if required_errors:
-        errors.update(required_errors)
-    if 'title' in data and data['title']:
-        title = str(data['title']).strip()
-        if len(title) < 3:
-            if "title" not in errors:
-                errors["title"] = []
-            errors["title"].append("Title must be at least 3 characters long")
-        if len(title) > 200:
-            if "title" not in errors:
-                errors["title"] = []
-            errors["title"].append("Title must not exceed 200 characters")
-    if 'description' in data and data['description']:
-        description = str(data['description']).strip()
-        if len(description) > 2000:
-            if "description" not in errors:
-                errors["description"] = []
-            errors["description"].append("Description must not exceed 2000 characters")
-
-    return errors
-
-
-def validate_login(data: Dict) -> Dict[str, List[str]]:
-    """Validate login data"""
-    errors = {}
-    required_errors = validate_required_fields(data, ['email', 'password'])
-    if required_errors:
-        errors.update(required_errors)
-
-    return errors
-
-
-def validate_ad_update(data: Dict) -> Dict[str, List[str]]:
-    """Validate ad update data"""
-    errors = {}
-    if not any(key in data for key in ['title', 'description']):
-        errors["general"] = ["At least one field (title or description) must be provided for update"]
-    if 'title' in data and data['title']:
-        title = str(data['title']).strip()
-        if len(title) < 3:
-            if "title" not in errors:
-                errors["title"] = []
-            errors["title"].append("Title must be at least 3 characters long")
-        if len(title) > 200:
-            if "title" not in errors:
-                errors["title"] = []
-            errors["title"].append("Title must not exceed 200 characters")
-    if 'description' in data and data['description']:
-        description = str(data['description']).strip()
-        if len(description) > 2000:
-            if "description" not in errors:
-                errors["description"] = []
-            errors["description"].append("Description must not exceed 2000 characters")
-
-    return errors
\ No newline at end of file
+    return compile_schema([Field(name, required=True) for name in required_fields])(data)
+
+
+_title = dict(min_length=3, max_length=200)
+_description = dict(max_length=2000)
+
+validate_user_registration = compile_schema([
+    Field('email', required=True, pattern=EMAIL_PATTERN,
+          pattern_message="Invalid email format: '{value}'"),
+    Field('password', required=True, strip=False, min_length=8),
+    Field('username', required=True, min_length=3, pattern=USERNAME_PATTERN,
+          pattern_message="Username can only contain letters, numbers and underscores"),
+])
+validate_user_registration.__doc__ = "Validate user registration data"
+
+validate_ad_creation = compile_schema([
+    Field('title', required=True, **_title),
+    Field('description', **_description),
+])
+validate_ad_creation.__doc__ = "Validate ad creation data"
+
+validate_login = compile_schema([
+    Field('email', required=True),
+    Field('password', required=True),
+])
+validate_login.__doc__ = "Validate login data"
+
+validate_ad_update = compile_schema([
+    Field('title', **_title),
+    Field('description', **_description),
+], require_any=['title', 'description'])
+validate_ad_update.__doc__ = "Validate ad update data"
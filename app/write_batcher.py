@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class WriteBatcher:
+    """Group commit: run concurrent writes in one shared transaction.
+
+    Each submitted operation runs inside its own SAVEPOINT, so a failing
+    statement is rolled back alone and reported to its caller, while the
+    rest of the batch is committed with a single COMMIT.
+    """
+
+    def __init__(self, window_ms: float, max_size: int):
+        self.window = max(window_ms, 0) / 1000
+        self.max_size = max(max_size, 1)
+        self._db: Optional[aiosqlite.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.writes = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    async def start(self, db: aiosqlite.Connection) -> None:
+        """Start the commit loop on the given writer connection"""
+        self._db = db
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush pending writes and stop the commit loop"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        self._queue = None
+        self._db = None
+
+    async def submit(self, op: WriteOp) -> Any:
+        """Run op(db) in the next batch and return its result"""
+        if self._queue is None:
+            raise RuntimeError("Database not initialized")
+        if self._task.done():
+            raise RuntimeError("Write batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, future))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size metrics since start"""
+        return {
+            "batches": self.batches,
+            "writes": self.writes,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": self.writes / self.batches if self.batches else 0.0,
+            "batch_size_buckets": dict(zip(
+                [str(b) for b in BATCH_SIZE_BUCKETS] + ["+Inf"],
+                self.batch_size_counts
+            )),
+        }
+
+    async def _collect(self) -> Tuple[List[Tuple[WriteOp, asyncio.Future]], bool]:
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_size:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if stopping:
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is not None:
+                        batch.append(item)
+            if batch:
+                try:
+                    await self._execute(batch)
+                except Exception as e:
+                    # Keep the loop alive: a dead loop would leave every later submit() waiting
+                    logger.error(f"<Write batch of {len(batch)} crashed: {e}>")
+                    self._fail(batch, e)
+
+    async def _execute(self, batch: List[Tuple[WriteOp, asyncio.Future]]) -> None:
+        db = self._db
+        results = []
+        try:
+            if db.in_transaction:
+                # Left open by a batch whose rollback failed
+                await self._rollback()
+            await db.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                await db.execute("SAVEPOINT write_op")
+                try:
+                    result = await op(db)
+                except Exception as e:
+                    await db.execute("ROLLBACK TO write_op")
+                    await db.execute("RELEASE write_op")
+                    results.append((future, None, e))
+                else:
+                    await db.execute("RELEASE write_op")
+                    results.append((future, result, None))
+            await db.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"<Write batch of {len(batch)} failed: {e}>")
+            await self._rollback()
+            self._fail(batch, e)
+            return
+
+        self._record(len(batch))
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def _rollback(self) -> None:
+        try:
+            if self._db.in_transaction:
+                await self._db.execute("ROLLBACK")
+        except Exception as e:
+            logger.error(f"<Write batch rollback failed: {e}>")
+
+    @staticmethod
+    def _fail(batch: List[Tuple[WriteOp, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.writes += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        for i, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                self.batch_size_counts[i] += 1
+                break
+        else:
+            self.batch_size_counts[-1] += 1
@@ -0,0 +1,37 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks boot the real application in-process against a throwaway
+SQLite file, so call use_temp_database() before importing anything
+from the app package: settings are read from the environment at import.
+"""
+import os
+import statistics
+import tempfile
+from typing import Dict, List
+
+
+def use_temp_database() -> str:
+    """Point DATABASE_PATH at a fresh temporary file and return its path"""
+    tmpdir = tempfile.mkdtemp(prefix="ads-bench-")
+    path = os.path.join(tmpdir, "ads.db")
+    os.environ["DATABASE_PATH"] = path
+    return path
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Summarize latencies given in seconds as milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,80 @@
+"""Concurrent GET /api/ads/{id}: one viral ad, and a feed of distinct ads.
+
+Boots create_app() in-process and, each round, fires --concurrency
+requests at once and waits for all of them. Reports per-round latency,
+rounds per second and the database queries run per round, which
+concurrent reads of the same or neighbouring ids share.
+
+    python -m benchmarks.hot_ad --ads 10000 --concurrency 100 --rounds 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from .common import use_temp_database, latency_summary
+
+
+async def _rounds(client, ad_loader, ids_for_round, rounds: int) -> dict:
+    async def fetch(ad_id):
+        async with client.get(f'/api/ads/{ad_id}') as response:
+            await response.read()
+            return response.status
+
+    samples = []
+    batches = ad_loader.stats()["batches"]
+    for n in range(rounds):
+        ids = ids_for_round(n)
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(fetch(ad_id) for ad_id in ids))
+        samples.append(time.perf_counter() - start)
+        assert statuses == [200] * len(ids)
+    summary = latency_summary(samples)
+    summary["rounds_per_second"] = round(rounds / sum(samples), 1)
+    summary["queries_per_round"] = round((ad_loader.stats()["batches"] - batches) / rounds, 2)
+    return summary
+
+
+async def main(args):
+    use_temp_database()
+    from aiohttp import TCPConnector
+    from aiohttp.test_utils import TestClient, TestServer
+    from run import create_app
+    from app.database import ad_loader, create_ads
+
+    app = await create_app()
+    # One connection per in-flight request, so the client does not queue them
+    connector = TCPConnector(limit=args.concurrency)
+    async with TestClient(TestServer(app), connector=connector) as client:
+        ad_ids = await create_ads([
+            {'title': f"Ad {i}", 'description': "Seeded by the hot ad benchmark", 'owner_id': 1}
+            for i in range(args.ads)
+        ])
+        rng = random.Random(1)
+        results = {
+            "same_id": await _rounds(
+                client, ad_loader, lambda n: [ad_ids[n % len(ad_ids)]] * args.concurrency, args.rounds
+            ),
+            "distinct_ids": await _rounds(
+                client, ad_loader, lambda n: rng.sample(ad_ids, args.concurrency), args.rounds
+            ),
+        }
+
+    print(json.dumps({
+        "benchmark": "hot_ad",
+        "config": {"ads": args.ads, "concurrency": args.concurrency, "rounds": args.rounds},
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ads', type=int, default=10000, help="ads to seed")
+    parser.add_argument('--concurrency', type=int, default=100, help="requests per round")
+    parser.add_argument('--rounds', type=int, default=50, help="rounds per scenario")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(main(args))
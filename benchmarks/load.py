@@ -0,0 +1,206 @@
+"""Mixed-workload load test against an in-process server.
+
+Boots create_app() on a temporary SQLite file, seeds users and ads, then
+drives list/get/create/update/login requests at a target concurrency and
+prints throughput and latency percentiles per operation as JSON.
+
+    python -m benchmarks.load --duration 10 --concurrency 32 --output run.json
+    python -m benchmarks.load --baseline run.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Dict, List
+
+from .common import use_temp_database, latency_summary
+
+PASSWORD = "password123"
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {'list', 'get', 'create', 'update', 'login'}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown operations: {', '.join(sorted(unknown))}")
+    return mix
+
+
+async def _seed(users: int, ads: int):
+    from app.database import create_user, create_ads
+    from app.security import get_password_hash
+    from app.api.handlers.auth import create_access_token
+
+    hashed = get_password_hash(PASSWORD)
+    accounts = []
+    for i in range(users):
+        email = f"user{i}@example.com"
+        user_id = await create_user({'email': email, 'username': f"user{i}", 'hashed_password': hashed})
+        accounts.append({
+            'id': user_id,
+            'email': email,
+            'token': create_access_token({"sub": email, "user_id": user_id}),
+            'ads': [],
+        })
+
+    chunk = 5000
+    for start in range(0, ads, chunk):
+        owners = [accounts[i % users] for i in range(start, min(start + chunk, ads))]
+        ad_ids = await create_ads([
+            {'title': f"Seeded ad {start + n}", 'description': "Seeded by the load test",
+             'owner_id': owner['id']}
+            for n, owner in enumerate(owners)
+        ])
+        for ad_id, owner in zip(ad_ids, owners):
+            owner['ads'].append(ad_id)
+    return accounts
+
+
+class Workload:
+    def __init__(self, client, accounts: List[dict], mix: Dict[str, float], seed: int):
+        self.client = client
+        self.accounts = accounts
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.rng = random.Random(seed)
+        self.samples: Dict[str, List[float]] = {op: [] for op in self.ops}
+        self.errors: Dict[str, int] = {op: 0 for op in self.ops}
+
+    def _headers(self, account):
+        return {'Authorization': f"Bearer {account['token']}"}
+
+    def _request(self, op: str):
+        account = self.rng.choice(self.accounts)
+        if op == 'list':
+            return self.client.get('/api/ads', params={'limit': 20})
+        if op == 'get':
+            owner = self.rng.choice(self.accounts)
+            ad_id = self.rng.choice(owner['ads']) if owner['ads'] else 1
+            return self.client.get(f'/api/ads/{ad_id}')
+        if op == 'create':
+            return self.client.post('/api/ads', headers=self._headers(account),
+                                    json={'title': 'Load test ad', 'description': 'Created under load'})
+        if op == 'update':
+            ad_id = self.rng.choice(account['ads']) if account['ads'] else 1
+            return self.client.put(f'/api/ads/{ad_id}', headers=self._headers(account),
+                                   json={'title': f'Updated {self.rng.random():.6f}'})
+        return self.client.post('/api/auth/login',
+                                json={'email': account['email'], 'password': PASSWORD})
+
+    async def worker(self, deadline: float, remaining: List[int]):
+        while time.perf_counter() < deadline and remaining[0] != 0:
+            remaining[0] -= 1
+            op = self.rng.choices(self.ops, self.weights)[0]
+            start = time.perf_counter()
+            async with self._request(op) as response:
+                await response.read()
+                if response.status >= 400:
+                    self.errors[op] += 1
+            self.samples[op].append(time.perf_counter() - start)
+
+
+async def run(args) -> dict:
+    use_temp_database()
+    from aiohttp.test_utils import TestClient, TestServer
+    from run import create_app
+
+    boot_start = time.perf_counter()
+    app = await create_app()
+    async with TestClient(TestServer(app)) as client:
+        boot_seconds = time.perf_counter() - boot_start
+
+        seed_start = time.perf_counter()
+        accounts = await _seed(args.users, args.ads)
+        seed_seconds = time.perf_counter() - seed_start
+
+        workload = Workload(client, accounts, args.mix, args.seed)
+        remaining = [args.requests if args.requests else -1]
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            workload.worker(start + args.duration, remaining) for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    all_samples = [s for samples in workload.samples.values() for s in samples]
+    return {
+        "benchmark": "load",
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "users": args.users,
+            "ads": args.ads,
+            "mix": args.mix,
+        },
+        "boot_seconds": round(boot_seconds, 4),
+        "seed_seconds": round(seed_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(all_samples) / elapsed, 1) if elapsed else 0.0,
+        "errors": sum(workload.errors.values()),
+        "overall": latency_summary(all_samples),
+        "operations": {
+            op: {**latency_summary(samples), "errors": workload.errors[op],
+                 "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0}
+            for op, samples in workload.samples.items()
+        },
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions of result against baseline beyond the relative tolerance"""
+    regressions = []
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {result['throughput_rps']} rps < baseline {baseline['throughput_rps']} rps"
+        )
+    for op, stats in result["operations"].items():
+        base = baseline.get("operations", {}).get(op)
+        if not base or not stats.get("count") or not base.get("count"):
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if stats[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{op} {key} {stats[key]} > baseline {base[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run")
+    parser.add_argument('--requests', type=int, default=0, help="stop after this many requests (0 = no limit)")
+    parser.add_argument('--concurrency', type=int, default=32, help="concurrent client workers")
+    parser.add_argument('--users', type=int, default=20, help="users to seed")
+    parser.add_argument('--ads', type=int, default=10000, help="ads to seed")
+    parser.add_argument('--mix', type=_parse_mix, default=_parse_mix("list=50,get=30,create=10,update=8,login=2"),
+                        help="operation weights, e.g. list=50,get=30,create=10,update=8,login=2")
+    parser.add_argument('--seed', type=int, default=1, help="random seed")
+    parser.add_argument('--output', help="also write the JSON result to this file")
+    parser.add_argument('--baseline', help="JSON result of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    result = asyncio.run(run(args))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        result["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
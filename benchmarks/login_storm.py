@@ -0,0 +1,80 @@
+"""p99 latency of GET /api/ads with and without a concurrent login storm.
+
+    python -m benchmarks.login_storm --duration 5 --logins 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from .common import use_temp_database, latency_summary
+
+
+async def _poll_ads(client, stop: asyncio.Event, samples: list, concurrency: int):
+    async def worker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            async with client.get('/api/ads') as response:
+                await response.read()
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _login_storm(client, stop: asyncio.Event, credentials: dict, concurrency: int, counts: dict):
+    async def worker():
+        while not stop.is_set():
+            async with client.post('/api/auth/login', json=credentials) as response:
+                await response.read()
+                counts[response.status] = counts.get(response.status, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _phase(client, duration: float, readers: int, logins: int, credentials: dict):
+    stop = asyncio.Event()
+    samples = []
+    counts = {}
+    tasks = [asyncio.create_task(_poll_ads(client, stop, samples, readers))]
+    if logins:
+        tasks.append(asyncio.create_task(_login_storm(client, stop, credentials, logins, counts)))
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    result = latency_summary(samples)
+    if logins:
+        result["login_statuses"] = {str(k): v for k, v in counts.items()}
+    return result
+
+
+async def main(args):
+    use_temp_database()
+    from aiohttp.test_utils import TestClient, TestServer
+    from run import create_app
+    from app.database import create_ads
+
+    app = await create_app()
+    async with TestClient(TestServer(app)) as client:
+        credentials = {'email': 'storm@example.com', 'password': 'password123'}
+        await client.post('/api/auth/register', json={**credentials, 'username': 'storm'})
+        await create_ads([{'title': f'Ad {i}', 'owner_id': 1} for i in range(args.ads)])
+
+        baseline = await _phase(client, args.duration, args.readers, 0, credentials)
+        storm = await _phase(client, args.duration, args.readers, args.logins, credentials)
+
+    print(json.dumps({
+        "benchmark": "login_storm",
+        "get_ads_baseline": baseline,
+        "get_ads_during_login_storm": storm,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per phase")
+    parser.add_argument('--readers', type=int, default=8, help="concurrent GET /api/ads clients")
+    parser.add_argument('--logins', type=int, default=32, help="concurrent login clients")
+    parser.add_argument('--ads', type=int, default=1000, help="ads to seed")
+    logging.disable(logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""Per-request cost of metrics recording on the hot path.
+
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from app.metrics import db_query_duration_seconds, http_requests_total, http_request_duration_seconds
+from app.middlewares import metrics_middleware
+
+
+async def _handler(request):
+    return _RESPONSE
+
+
+_RESPONSE = web.Response(text="ok")
+
+
+async def _loop(call, request, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await call(request)
+    return time.perf_counter() - start
+
+
+async def main(args):
+    app = web.Application()
+    app.router.add_get(r'/api/ads/{id:\d+}', _handler)
+    request = make_mocked_request('GET', '/api/ads/42', app=app)
+    match_info = await app.router.resolve(request)
+    match_info.add_app(app)
+    request._match_info = match_info
+
+    async def direct(req):
+        return await _handler(req)
+
+    async def wrapped(req):
+        return await metrics_middleware(req, _handler)
+
+    await _loop(wrapped, request, 1000)
+    baseline = await _loop(direct, request, args.requests)
+    instrumented = await _loop(wrapped, request, args.requests)
+
+    child = db_query_duration_seconds.labels("bench")
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        child.observe(0.0001)
+    observe = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        http_request_duration_seconds.observe(0.0001, "GET", "/api/ads/{id}")
+        http_requests_total.inc("GET", "/api/ads/{id}", "200")
+    record = time.perf_counter() - start
+
+    per_us = 1e6 / args.requests
+    print(json.dumps({
+        "benchmark": "metrics_overhead",
+        "requests": args.requests,
+        "middleware_overhead_us": round((instrumented - baseline) * per_us, 3),
+        "request_record_us": round(record * per_us, 3),
+        "histogram_child_observe_us": round(observe * per_us, 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200000, help="iterations per measurement")
+    asyncio.run(main(parser.parse_args()))
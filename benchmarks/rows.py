@@ -0,0 +1,126 @@
+"""Memory and throughput of row representations.
+
+Ad listings are built from SELECT tuples and encoded right away. Compares
+the per-row dicts app.database builds with a __slots__ record written out
+through the shared JSON layer's as_dict() hook: build time, encode time
+and both together on a 100k-row listing. Users are held in the user cache,
+so for them the resident size of a dict and of an app.models.User record
+is compared (tracemalloc).
+
+    python -m benchmarks.rows --rows 100000 --repeat 5
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app import serialization
+from app.database import _ad, _iso
+from app.models import User
+
+
+class _AdRecord:
+    __slots__ = ("id", "title", "description", "created_at", "owner_id")
+
+    def __init__(self, id, title, description, created_at, owner_id):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.created_at = created_at
+        self.owner_id = owner_id
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "created_at": self.created_at,
+            "owner_id": self.owner_id
+        }
+
+
+def _user_dict(row):
+    return {
+        "id": row[0],
+        "email": row[1],
+        "username": row[2],
+        "hashed_password": row[3],
+        "created_at": row[4]
+    }
+
+
+def _ad_rows(count: int):
+    start = int(datetime(2024, 1, 1).timestamp())
+    return [
+        (i, f"Ad number {i}", "Lorem ipsum dolor sit amet, consectetur adipiscing elit", start + i, i % 100)
+        for i in range(count)
+    ]
+
+
+def _user_rows(count: int):
+    start = datetime(2024, 1, 1)
+    return [
+        (i, f"user{i}@example.com", f"user {i}", "$2b$12$" + "x" * 53,
+         (start + timedelta(seconds=i)).isoformat(' '))
+        for i in range(count)
+    ]
+
+
+def _memory(build, rows) -> int:
+    gc.collect()
+    tracemalloc.start()
+    records = build(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def _timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def main(args):
+    ad_rows = _ad_rows(args.rows)
+    listings = {
+        "dict": lambda rows: [_ad(row) for row in rows],
+        "slots_record": lambda rows: [_AdRecord(row[0], row[1], row[2], _iso(row[3]), row[4]) for row in rows],
+    }
+    listing = {}
+    for name, build in listings.items():
+        records = build(ad_rows)
+        listing[name] = {
+            "build_ms": _timed(lambda: build(ad_rows), args.repeat),
+            "encode_ms": _timed(lambda: serialization.dumps_bytes({"items": records}), args.repeat),
+            "build_and_encode_ms": _timed(
+                lambda: serialization.dumps_bytes({"items": build(ad_rows)}), args.repeat
+            ),
+        }
+
+    user_rows = _user_rows(args.rows)
+    held = {
+        "dict": {"memory_mb": round(_memory(lambda rows: [_user_dict(row) for row in rows], user_rows) / 1e6, 2)},
+        "slots_record": {"memory_mb": round(_memory(lambda rows: [User(*row) for row in rows], user_rows) / 1e6, 2)},
+    }
+
+    print(json.dumps({
+        "benchmark": "rows",
+        "rows": args.rows,
+        "backend": serialization.BACKEND,
+        "ads_listing": listing,
+        "held_users": held,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help="rows per listing")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement, best is reported")
+    main(parser.parse_args())
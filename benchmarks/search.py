@@ -0,0 +1,86 @@
+"""Full-text search latency on a large seeded ads table.
+
+    python -m benchmarks.search --ads 1000000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from .common import use_temp_database, latency_summary
+
+VOCABULARY = [f"word{i}" for i in range(20000)]
+COMMON = ["bike", "sofa", "phone", "laptop", "apartment", "car"]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    picked = rng.choices(VOCABULARY, k=words)
+    if rng.random() < 0.3:
+        picked[rng.randrange(words)] = rng.choice(COMMON)
+    return ' '.join(picked)
+
+
+async def _seed(create_ads, count: int, chunk: int = 5000):
+    rng = random.Random(42)
+    for start in range(0, count, chunk):
+        await create_ads([
+            {'title': _text(rng, 4), 'description': _text(rng, 40), 'owner_id': 1}
+            for _ in range(min(chunk, count - start))
+        ])
+
+
+async def main(args):
+    use_temp_database()
+    from app import database
+
+    await database.init_db()
+    try:
+        start = time.perf_counter()
+        await _seed(database.create_ads, args.ads)
+        seed_seconds = time.perf_counter() - start
+
+        queries = {
+            "common_term": "bike",
+            "rare_term": "word1234",
+            "prefix": "lap*",
+            "wide_prefix": "word12*",
+            "two_terms": "bike word77*",
+        }
+        results = {}
+        for name, text in queries.items():
+            query = database.build_search_query(text)
+            samples = []
+            after = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                _, after = await database.search_ads(query, args.limit)
+                samples.append(time.perf_counter() - start)
+            results[name] = latency_summary(samples)
+
+            if after is not None:
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    await database.search_ads(query, args.limit, after)
+                    samples.append(time.perf_counter() - start)
+                results[name + "_page2"] = latency_summary(samples)
+    finally:
+        await database.close_db()
+
+    print(json.dumps({
+        "benchmark": "search",
+        "ads": args.ads,
+        "seed_seconds": round(seed_seconds, 2),
+        "queries": results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ads', type=int, default=1_000_000, help="ads to seed")
+    parser.add_argument('--repeat', type=int, default=50, help="runs per query")
+    parser.add_argument('--limit', type=int, default=20, help="page size")
+    logging.disable(logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
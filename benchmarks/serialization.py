@@ -0,0 +1,75 @@
+"""Encode throughput of the shared JSON layer on a 10k-ad payload.
+
+    python -m benchmarks.serialization --ads 10000 --repeat 20
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from app import serialization
+
+
+class DateTimeEncoder(json.JSONEncoder):
+    """The per-handler encoder the shared layer replaced"""
+
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+def _payload(count: int, as_datetime: bool):
+    start = datetime(2024, 1, 1)
+    items = []
+    for i in range(count):
+        created_at = start + timedelta(seconds=i)
+        items.append({
+            "id": i,
+            "title": f"Ad number {i}",
+            "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 3,
+            "created_at": created_at if as_datetime else created_at.isoformat(' '),
+            "owner_id": i % 100,
+        })
+    return {"items": items, "next_cursor": None}
+
+
+def _measure(func, payload, repeat: int):
+    size = len(func(payload))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(payload)
+    elapsed = time.perf_counter() - start
+    return {
+        "ms_per_encode": round(elapsed / repeat * 1000, 3),
+        "mb_per_s": round(size * repeat / elapsed / 1e6, 1),
+    }
+
+
+def main(args):
+    encoders = {
+        "legacy_datetime_encoder": lambda x: json.dumps(x, cls=DateTimeEncoder).encode(),
+        f"shared_{serialization.BACKEND}": serialization.dumps_bytes,
+    }
+    if serialization.BACKEND != "json":
+        stdlib = json.JSONEncoder(default=serialization._default, separators=(',', ':'))
+        encoders["shared_json_fallback"] = lambda x: stdlib.encode(x).encode()
+
+    results = {}
+    for rows in ("text_timestamps", "datetime_timestamps"):
+        payload = _payload(args.ads, rows == "datetime_timestamps")
+        results[rows] = {name: _measure(func, payload, args.repeat) for name, func in encoders.items()}
+
+    print(json.dumps({
+        "benchmark": "serialization",
+        "ads": args.ads,
+        "backend": serialization.BACKEND,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ads', type=int, default=10000, help="ads per payload")
+    parser.add_argument('--repeat', type=int, default=20, help="encodes per measurement")
+    main(parser.parse_args())
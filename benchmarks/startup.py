@@ -0,0 +1,109 @@
+"""Cold-start time of the application.
+
+Each sample is a fresh interpreter, so module imports are paid every time,
+as on a real (re)start. Reports the medians of importing run.py, building
+the app with create_app(), running its startup hooks (database open and
+migrations) and answering a first GET /api/ads, plus the time to first
+request measured from process spawn. Runs first on an empty database,
+then on an already-migrated one, which is the usual restart.
+
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .common import use_temp_database
+
+PHASES = ("import_seconds", "create_app_seconds", "startup_seconds", "first_request_seconds",
+          "time_to_first_request_seconds")
+
+
+async def _boot() -> dict:
+    start = time.perf_counter()
+    from aiohttp import web
+    from run import create_app
+    imported = time.perf_counter()
+
+    app = await create_app()
+    created = time.perf_counter()
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    started = time.perf_counter()
+
+    port = site._server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /api/ads HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    answered = time.perf_counter()
+    answered_at = time.time()
+    writer.close()
+    await runner.cleanup()
+    if status != b"200":
+        raise RuntimeError(f"First request failed with status {status.decode()}")
+
+    return {
+        "import_seconds": imported - start,
+        "create_app_seconds": created - imported,
+        "startup_seconds": started - created,
+        "first_request_seconds": answered - started,
+        "answered_at": answered_at,
+    }
+
+
+def _child() -> None:
+    logging.disable(logging.WARNING)
+    print(json.dumps(asyncio.run(_boot())))
+
+
+def _sample(env: dict) -> dict:
+    spawned_at = time.time()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    sample = json.loads(output.splitlines()[-1])
+    # Includes interpreter start, which the child cannot time itself
+    sample["time_to_first_request_seconds"] = sample.pop("answered_at") - spawned_at
+    return sample
+
+
+def _median(samples) -> dict:
+    return {phase: round(statistics.median(s[phase] for s in samples), 4) for phase in PHASES}
+
+
+def main(args) -> dict:
+    fresh, migrated = [], []
+    for _ in range(args.repeat):
+        use_temp_database()
+        env = dict(os.environ)
+        fresh.append(_sample(env))
+        migrated.append(_sample(env))
+
+    return {
+        "benchmark": "startup",
+        "config": {"repeat": args.repeat},
+        "fresh_database": _median(fresh),
+        "migrated_database": _median(migrated),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="cold starts per database state")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child()
+    else:
+        print(json.dumps(main(args), indent=2))
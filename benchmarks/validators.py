@@ -0,0 +1,145 @@
+"""Throughput of the compiled validators against the hand-written ones they replaced.
+
+    python -m benchmarks.validators --payloads 5000 --repeat 5
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from app import validators
+
+
+def _legacy_required(data, required_fields):
+    errors = {}
+    for field in required_fields:
+        if field not in data or not str(data[field]).strip():
+            if "required" not in errors:
+                errors["required"] = []
+            errors["required"].append(f"Field '{field}' is required")
+    return errors
+
+
+def _legacy_email_format(email):
+    if not email or not isinstance(email, str):
+        return False
+    email = email.strip()
+    if '@' not in email:
+        return False
+    parts = email.split('@')
+    if len(parts) != 2:
+        return False
+    local_part, domain = parts
+    if not local_part or not domain:
+        return False
+    if '.' not in domain:
+        return False
+    domain_parts = domain.split('.')
+    if len(domain_parts[-1]) < 2:
+        return False
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(pattern, email))
+
+
+def legacy_user_registration(data):
+    """The per-call implementation app.validators used before schemas"""
+    errors = {}
+    required_errors = _legacy_required(data, ['email', 'password', 'username'])
+    if required_errors:
+        errors.update(required_errors)
+    if 'email' in data and data['email']:
+        email = str(data['email']).strip()
+        if not _legacy_email_format(email):
+            errors.setdefault("email", []).append(f"Invalid email format: '{email}'")
+    if 'password' in data and data['password']:
+        if len(str(data['password'])) < 8:
+            errors.setdefault("password", []).append("Password must be at least 8 characters long")
+    if 'username' in data and data['username']:
+        username = str(data['username']).strip()
+        if len(username) < 3:
+            errors.setdefault("username", []).append("Username must be at least 3 characters long")
+        if not re.match(r'^[a-zA-Z0-9_]+$', username):
+            errors.setdefault("username", []).append(
+                "Username can only contain letters, numbers and underscores"
+            )
+    return errors
+
+
+def legacy_ad_creation(data):
+    """The per-call implementation app.validators used before schemas"""
+    errors = {}
+    required_errors = _legacy_required(data, ['title'])
+    if required_errors:
+        errors.update(required_errors)
+    if 'title' in data and data['title']:
+        title = str(data['title']).strip()
+        if len(title) < 3:
+            errors.setdefault("title", []).append("Title must be at least 3 characters long")
+        if len(title) > 200:
+            errors.setdefault("title", []).append("Title must not exceed 200 characters")
+    if 'description' in data and data['description']:
+        if len(str(data['description']).strip()) > 2000:
+            errors.setdefault("description", []).append("Description must not exceed 2000 characters")
+    return errors
+
+
+def _payloads(count: int, rng: random.Random):
+    users, ads = [], []
+    for i in range(count):
+        bad = rng.random() < 0.2
+        users.append({
+            'email': f"user{i}@example" if bad else f"user{i}@example.com",
+            'password': "short" if bad else "password123",
+            'username': f"user {i}" if bad else f"user_{i}",
+        })
+        ads.append({
+            'title': "ab" if bad else f"Ad number {i}",
+            'description': "Lorem ipsum dolor sit amet " * rng.randint(1, 20),
+        })
+    return users, ads
+
+
+def _measure(func, payloads, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payloads)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "us_per_payload": round(best / len(payloads) * 1e6, 3),
+        "payloads_per_s": round(len(payloads) / best),
+    }
+
+
+def main(args):
+    users, ads = _payloads(args.payloads, random.Random(args.seed))
+    cases = {
+        "user_registration": (users, legacy_user_registration, validators.validate_user_registration),
+        "ad_creation": (ads, legacy_ad_creation, validators.validate_ad_creation),
+    }
+
+    results = {}
+    for name, (payloads, legacy, compiled) in cases.items():
+        assert [legacy(p) for p in payloads] == [compiled(p) for p in payloads]
+        results[name] = {
+            "legacy": _measure(lambda ps: [legacy(p) for p in ps], payloads, args.repeat),
+            "compiled": _measure(lambda ps: [compiled(p) for p in ps], payloads, args.repeat),
+            "compiled_batch": _measure(
+                lambda ps: validators.validate_many(compiled, ps), payloads, args.repeat
+            ),
+        }
+
+    print(json.dumps({
+        "benchmark": "validators",
+        "payloads": args.payloads,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payloads', type=int, default=5000, help="payloads per run")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement, best is reported")
+    parser.add_argument('--seed', type=int, default=1, help="random seed")
+    main(parser.parse_args())
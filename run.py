@@ -1,24 +1,25 @@
+import argparse
 import asyncio
 import logging
+import multiprocessing
+import multiprocessing.connection
+import os
 import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
 from aiohttp import web
 import aiohttp_cors
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
 
-async def health_check(request):
-    """Health check endpoint"""
-    return web.json_response({
-        "status": "ok",
-        "service": "ads-api"
-    })
-
-
 async def create_app():
     app = web.Application()
     cors = aiohttp_cors.setup(app, defaults={
@@ -29,17 +30,20 @@ async def create_app():
         )
     })
 
-    app.router.add_get('/health', health_check)
-
     try:
         from app.api.routes import setup_routes
         from app.middlewares import setup_middlewares
         from app.database import init_db, close_db
+        from app.security import shutdown_password_executor
+        from app.metrics import start_loop_lag_monitor, stop_loop_lag_monitor
 
         setup_middlewares(app)
         setup_routes(app, cors)
         app.on_startup.append(init_db)
+        app.on_startup.append(start_loop_lag_monitor)
+        app.on_cleanup.append(stop_loop_lag_monitor)
         app.on_cleanup.append(close_db)
+        app.on_cleanup.append(shutdown_password_executor)
         logger.info("API routes loaded")
     except ImportError as e:
         logger.warning(f"API routes not available: {e}")
@@ -47,33 +51,28 @@ async def create_app():
     return app
 
 
-async def run_app():
+async def run_app(host, port):
     app = await create_app()
     runner = web.AppRunner(app)
 
     await runner.setup()
 
     try:
-        # Вариант 1: localhost
-        site = web.TCPSite(runner, 'localhost', 8080)
+        site = web.TCPSite(runner, host, port)
         await site.start()
-        logger.info("Server started on http://localhost:8080")
-    except Exception as e1:
-        logger.warning(f"Failed on localhost: {e1}")
-        try:
-            site = web.TCPSite(runner, '127.0.0.1', 8080)
-            await site.start()
-            logger.info("Server started on http://127.0.0.1:8080")
-        except Exception as e2:
-            logger.warning(f"Failed on 127.0.0.1: {e2}")
-            try:
-                site = web.TCPSite(runner, '0.0.0.0', 8080)
-                await site.start()
-                logger.info("Server started on http://0.0.0.0:8080")
-            except Exception as e3:
-                logger.error(f"Failed to start server: {e3}")
-                return
+        logger.info(f"Server started on http://{host}:{port}")
+    except Exception as e:
+        logger.error(f"Failed to start server: {e}")
+        await runner.cleanup()
+        return
 
+    await wait_for_shutdown()
+    logger.info("Server stopped")
+    await runner.cleanup()
+
+
+async def wait_for_shutdown():
+    """Block until SIGINT or SIGTERM is received"""
     loop = asyncio.get_event_loop()
     stop = asyncio.Event()
 
@@ -85,14 +84,193 @@ async def run_app():
         loop.add_signal_handler(sig, shutdown)
 
     await stop.wait()
-    logger.info("Server stopped")
+
+
+async def run_worker(host, port, sock=None):
+    """Serve the app in a worker process; every worker opens its own database connections"""
+    app = await create_app()
+    runner = web.AppRunner(app)
+    await runner.setup()
+
+    if sock is not None:
+        site = web.SockSite(runner, sock)
+    else:
+        site = web.TCPSite(runner, host, port, reuse_port=True)
+    await site.start()
+    logger.info(f"Worker {os.getpid()} serving on http://{host}:{port}")
+
+    await wait_for_shutdown()
+    # cleanup() stops accepting and lets in-flight requests finish before closing the database
     await runner.cleanup()
+    logger.info(f"Worker {os.getpid()} stopped")
 
 
-if __name__ == "__main__":
+def _worker_main(host, port, sock):
+    # Forked workers inherit the supervisor's handlers; restore the defaults
+    # so a signal arriving before wait_for_shutdown() still stops the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
     try:
-        asyncio.run(run_app())
-    except KeyboardInterrupt:
-        logger.info("Server stopped by user")
+        asyncio.run(run_worker(host, port, sock))
     except Exception as e:
-        logger.error(f"Server error: {e}")
\ No newline at end of file
+        logger.error(f"Worker {os.getpid()} failed: {e}")
+        raise SystemExit(1)
+
+
+def supervise(workers, host, port, shutdown_timeout=30.0):
+    """Run workers sharing one port, restart crashed ones, stop all on SIGTERM/SIGINT"""
+    from app.database import prepare_db
+    from app.api.routes import preload_handlers
+    from app.security import preload
+
+    ctx = multiprocessing.get_context("fork")
+
+    # Migrate here once instead of in every worker at the same time
+    asyncio.run(prepare_db())
+    # Forked workers inherit these modules, so lazy imports cost them nothing
+    preload_handlers()
+    preload()
+
+    sock = None
+    if not hasattr(socket, "SO_REUSEPORT"):
+        # Without SO_REUSEPORT every worker accepts on one socket bound here
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(1024)
+        sock.setblocking(False)
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        if not stopping:
+            logger.info(f"Received signal {signum}, stopping {workers} workers")
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    def start(slot):
+        process = ctx.Process(target=_worker_main, args=(host, port, sock), name=f"worker-{slot}")
+        process.start()
+        return process, time.monotonic()
+
+    processes = {slot: start(slot) for slot in range(workers)}
+    backoff = {slot: 0.0 for slot in range(workers)}
+    restart_at = {}
+    logger.info(f"Supervisor {os.getpid()} started {workers} workers on http://{host}:{port}")
+
+    while not stopping:
+        multiprocessing.connection.wait(
+            [process.sentinel for process, _ in processes.values() if process.is_alive()],
+            timeout=1.0
+        )
+        if stopping:
+            break
+        now = time.monotonic()
+        for slot, (process, started) in list(processes.items()):
+            if process.is_alive():
+                continue
+            if slot not in restart_at:
+                # Back off when a worker keeps dying right after start, e.g. the port is taken
+                if now - started < 5.0:
+                    backoff[slot] = min(max(backoff[slot] * 2, 0.5), 30.0)
+                else:
+                    backoff[slot] = 0.0
+                restart_at[slot] = now + backoff[slot]
+                logger.warning(
+                    f"Worker {process.pid} exited with code {process.exitcode}, "
+                    f"restarting in {backoff[slot]:.1f}s"
+                )
+            if now >= restart_at[slot]:
+                del restart_at[slot]
+                processes[slot] = start(slot)
+
+    for process, _ in processes.values():
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + shutdown_timeout
+    for process, _ in processes.values():
+        process.join(max(deadline - time.monotonic(), 0))
+        if process.is_alive():
+            logger.warning(f"Worker {process.pid} did not stop in time, killing it")
+            process.kill()
+            process.join()
+
+    if sock is not None:
+        sock.close()
+    logger.info("Server stopped")
+
+
+async def _boot_once():
+    """Build and start the app once, print phase timings in ms"""
+    start = time.perf_counter()
+    app = await create_app()
+    created = time.perf_counter()
+    runner = web.AppRunner(app)
+    await runner.setup()
+    started = time.perf_counter()
+    await runner.cleanup()
+    print(f"create_app {(created - start) * 1000:.1f}")
+    print(f"startup_hooks {(started - created) * 1000:.1f}")
+
+
+def profile_startup(limit=20):
+    """Print where a cold start goes: import time per package, then app build and startup"""
+    # -X importtime only works from interpreter start, so the profile runs in a fresh process
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "import logging, asyncio; logging.disable(logging.WARNING); "
+         "import run; asyncio.run(run._boot_once())"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if child.returncode != 0:
+        raise SystemExit(child.stderr)
+
+    by_package = Counter()
+    for line in child.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not own.isdigit():
+            continue
+        # Our own modules are listed one by one, third-party ones per package
+        package = name if name == "run" or name.startswith("app.") else name.split(".")[0]
+        by_package[package] += int(own) / 1000
+
+    print("Import time by package, ms:")
+    for package, ms in by_package.most_common(limit):
+        print(f"  {package:<32} {ms:8.1f}")
+    print(f"  {'total':<32} {sum(by_package.values()):8.1f}")
+    for line in child.stdout.splitlines():
+        phase, ms = line.rsplit(" ", 1)
+        print(f"{phase + ', ms:':<34} {float(ms):8.1f}")
+
+
+def parse_args():
+    from app.config import HOST, PORT, WORKERS
+
+    parser = argparse.ArgumentParser(description="Ads API server")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="number of worker processes (1 = single process)")
+    parser.add_argument("--host", default=HOST, help="bind address")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import-time breakdown of a cold start and exit")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_startup:
+        profile_startup()
+    elif args.workers > 1:
+        supervise(args.workers, args.host, args.port)
+    else:
+        try:
+            asyncio.run(run_app(args.host, args.port))
+        except KeyboardInterrupt:
+            logger.info("Server stopped by user")
+        except Exception as e:
+            logger.error(f"Server error: {e}")
\ No newline at end of file
@@ -70,7 +70,7 @@ async def test_endpoints():
                 print(f"   Status: {status}")
                 if status == 200:
                     data = await response.json()
-                    print(f"    Success: Found {len(data)} ads")
+                    print(f"    Success: Found {len(data['items'])} ads")
                 else:
                     text = await response.text()
                     print(f"   Response: {text}")
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings are read at import, so the throwaway database is chosen before the app is loaded
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="ads-test-"), "ads.db"))
+
+
+@pytest.fixture
+def with_client():
+    """Run scenario(client) against an in-process app"""
+    from aiohttp.test_utils import TestClient, TestServer
+    from run import create_app
+
+    def run(scenario):
+        async def main():
+            app = await create_app()
+            async with TestClient(TestServer(app)) as client:
+                return await scenario(client)
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def auth_headers():
+    """Register and log in a fresh user, return its Authorization header"""
+    async def login(client):
+        email = f"{uuid.uuid4().hex}@example.com"
+        user = {'email': email, 'username': 'test_user', 'password': 'password123'}
+        async with client.post('/api/auth/register', json=user) as response:
+            assert response.status == 201
+        async with client.post('/api/auth/login', json={'email': email, 'password': 'password123'}) as response:
+            token = (await response.json())['access_token']
+        return {'Authorization': f'Bearer {token}'}
+
+    return login
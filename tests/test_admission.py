@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import AdmissionLimiter, Overloaded
+
+
+def test_waiters_are_admitted_in_order():
+    """Тест передачи освободившихся слотов ожидающим по очереди"""
+    async def main():
+        limiter = AdmissionLimiter(1, 10, 1.0)
+        order = []
+
+        async def request(name):
+            await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await asyncio.gather(*(request(i) for i in range(5)))
+        return order, limiter.stats()
+
+    order, stats = asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_and_deadline_are_rejected():
+    """Тест отказа при переполненной очереди и по истечении ожидания"""
+    async def main():
+        limiter = AdmissionLimiter(1, 1, 0.05)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await limiter.acquire()
+        with pytest.raises(Overloaded) as late:
+            await waiting
+        return full.value.reason, late.value.reason, limiter.stats()
+
+    full, late, stats = asyncio.run(main())
+    assert (full, late) == ("queue_full", "timeout")
+    assert stats["in_flight"] == 1 and stats["queued"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    """Тест отсутствия утечки слота при отмене ожидающего запроса"""
+    async def main():
+        limiter = AdmissionLimiter(1, 10, 1.0)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        limiter.release()
+        return limiter.stats()
+
+    stats = asyncio.run(main())
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_overloaded_request_gets_503(with_client, monkeypatch):
+    """Тест быстрого ответа 503 с Retry-After при перегрузке"""
+    monkeypatch.setitem(admission.limiters, "read", AdmissionLimiter(1, 0, 0.05))
+
+    async def scenario(client):
+        await admission.limiters["read"].acquire()
+        async with client.get('/api/ads') as busy:
+            busy_status, retry_after = busy.status, busy.headers.get('Retry-After')
+        async with client.get('/health') as health:
+            health_status = health.status
+        admission.limiters["read"].release()
+        async with client.get('/api/ads') as response:
+            return busy_status, retry_after, health_status, response.status
+
+    assert with_client(scenario) == (503, '1', 200, 200)
@@ -0,0 +1,28 @@
+def test_batch_accepts_max_items(with_client, auth_headers):
+    """Тест создания максимального числа объявлений одним запросом"""
+    from app.config import ADS_BULK_MAX_ITEMS
+
+    async def scenario(client):
+        headers = await auth_headers(client)
+        items = [{'title': f'Bulk ad {i}', 'description': 'd' * 300} for i in range(ADS_BULK_MAX_ITEMS)]
+        async with client.post('/api/ads/batch', json=items, headers=headers) as response:
+            return response.status, await response.json()
+
+    status, data = with_client(scenario)
+    assert status == 201
+    assert data['created'] == ADS_BULK_MAX_ITEMS
+
+
+def test_batch_body_too_large_returns_413(with_client, auth_headers):
+    """Тест ответа 413 на слишком большое тело запроса"""
+    from app.config import ADS_BULK_MAX_BODY_SIZE
+
+    async def scenario(client):
+        headers = await auth_headers(client)
+        body = b'[' + b' ' * ADS_BULK_MAX_BODY_SIZE + b']'
+        async with client.post('/api/ads/batch', data=body, headers={
+            **headers, 'Content-Type': 'application/json'
+        }) as response:
+            return response.status
+
+    assert with_client(scenario) == 413
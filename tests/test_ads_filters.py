@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import aiosqlite
+import pytest
+
+from app.database import build_ads_page_query
+from app.migrations import CREATED_AT_SECONDS, migrate, run_backfills, transaction_submit
+
+FILTERS = {'owner_id': 5, 'created_after': 1700000000, 'created_before': 1800000000, 'title_prefix': 'Bik'}
+COMBINATIONS = [combo for size in range(len(FILTERS) + 1) for combo in itertools.combinations(FILTERS, size)]
+
+
+def query_plans():
+    async def main():
+        db = await aiosqlite.connect(os.path.join(tempfile.mkdtemp(prefix="ads-plans-"), "ads.db"),
+                                     isolation_level=None)
+        try:
+            await migrate(db)
+            plans = {}
+            for combo, newest_first, after in itertools.product(COMBINATIONS, (True, False), (None, (1750000000, 3))):
+                sql, params = build_ads_page_query(
+                    20, after, newest_first=newest_first, **{name: FILTERS[name] for name in combo}
+                )
+                cursor = await db.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plans[combo, newest_first, after] = [row[3] for row in await cursor.fetchall()]
+                await cursor.close()
+            return plans
+        finally:
+            await db.close()
+
+    return asyncio.run(main())
+
+
+def test_no_filter_combination_scans_the_table():
+    """Тест использования индексов для всех сочетаний фильтров"""
+    for (combo, newest_first, after), plan in query_plans().items():
+        steps = [step for step in plan if ' ads ' in f"{step} "]
+        assert steps, plan
+        for step in steps:
+            # A plain "SCAN ads" is a full table scan
+            assert step.startswith(('SEARCH ads USING', 'SCAN ads USING INDEX')), (combo, plan)
+            if combo or after:
+                assert step.startswith('SEARCH ads USING'), (combo, plan)
+
+
+def test_listing_order_is_kept_while_created_ts_is_filled():
+    """Тест одинакового порядка и курсоров списка до и после заполнения created_ts"""
+    pending_key = f"COALESCE(created_ts, {CREATED_AT_SECONDS})"
+
+    async def walk(db, created_key, **filters):
+        ids, after = [], None
+        while True:
+            sql, params = build_ads_page_query(2, after, created_key=created_key, **filters)
+            cursor = await db.execute(sql, params)
+            rows = await cursor.fetchall()
+            await cursor.close()
+            ids += [row[0] for row in rows[:2]]
+            if len(rows) <= 2:
+                return ids
+            after = (rows[1][5], rows[1][0])
+
+    async def main():
+        db = await aiosqlite.connect(os.path.join(tempfile.mkdtemp(prefix="ads-created-ts-"), "ads.db"),
+                                     isolation_level=None)
+        try:
+            await migrate(db)
+            # Rows stored before the migration, and rows written since, which set created_ts
+            await db.executemany(
+                "INSERT INTO ads (title, created_at, owner_id) VALUES (?, ?, 1)",
+                [('old b', '2024-01-02 00:00:00'), ('old a', '2024-01-01 00:00:00.250000'),
+                 ('old c', '2024-01-03 00:00:00')]
+            )
+            await db.executemany(
+                "INSERT INTO ads (title, created_ts, owner_id) VALUES (?, ?, 1)",
+                [('new', 1704153600), ('newest', 1704400000)]
+            )
+            pending = [await walk(db, pending_key), await walk(db, pending_key, newest_first=False),
+                       await walk(db, pending_key, created_after=1704100000)]
+            await run_backfills(transaction_submit(db), pause=0)
+            done = [await walk(db, "created_ts"), await walk(db, "created_ts", newest_first=False),
+                    await walk(db, "created_ts", created_after=1704100000)]
+            return pending, done
+        finally:
+            await db.close()
+
+    pending, done = asyncio.run(main())
+    assert pending == done
+    # 'new' and 'old b' share a second, the id breaks the tie
+    assert done[0] == [5, 3, 4, 1, 2]
+    assert done[1] == done[0][::-1]
+    assert done[2] == [5, 3, 4, 1]
+
+
+def test_list_filters(with_client):
+    """Тест фильтрации и сортировки списка объявлений"""
+    from app.database import create_ads
+
+    async def scenario(client):
+        owner = 10 ** 6 + int(datetime.utcnow().timestamp()) % 1000
+        base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        ids = await create_ads([
+            {'title': title, 'owner_id': owner, 'created_at': base + timedelta(days=day)}
+            for day, title in enumerate(['Bike red', 'Sofa', 'Bike blue', 'bike lowercase'])
+        ])
+
+        async def listing(**params):
+            async with client.get('/api/ads', params={'owner_id': owner, **params}) as response:
+                assert response.status == 200, await response.text()
+                return [ad['id'] for ad in (await response.json())['items']]
+
+        return ids, {
+            'owner': await listing(),
+            'oldest': await listing(sort='oldest'),
+            'prefix': await listing(title_prefix='Bike'),
+            'after': await listing(created_after='2020-01-02T00:00:00'),
+            'before': await listing(created_before=str(int((base + timedelta(days=2)).timestamp()) + 1)),
+            'range': await listing(created_after='2020-01-01T12:00:00Z', created_before='2020-01-03'),
+            'created_at': (await (await client.get(f'/api/ads/{ids[1]}')).json())['created_at'],
+        }
+
+    ids, results = with_client(scenario)
+    assert results['owner'] == ids[::-1]
+    assert results['oldest'] == ids
+    assert results['prefix'] == [ids[2], ids[0]]
+    assert results['after'] == [ids[3], ids[2]]
+    assert results['before'] == [ids[2], ids[1], ids[0]]
+    assert results['range'] == [ids[1]]
+    assert results['created_at'] == '2020-01-02T00:00:00'
+
+
+@pytest.mark.parametrize("params", [
+    {'owner_id': 'abc'}, {'owner_id': '-1'}, {'created_after': 'yesterday'},
+    {'created_before': '2020-13-01'}, {'sort': 'random'},
+])
+def test_invalid_filters_return_400(with_client, params):
+    """Тест ответа 400 на некорректные фильтры"""
+    async def scenario(client):
+        async with client.get('/api/ads', params=params) as response:
+            return response.status
+
+    assert with_client(scenario) == 400
@@ -0,0 +1,69 @@
+import asyncio
+
+import app.api.handlers.ads as ads_handlers
+
+
+def test_list_cache_is_fresh_after_writes(with_client, auth_headers):
+    """Тест актуальности закэшированного списка после создания, изменения и удаления"""
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.post('/api/ads', json={'title': 'Cached kettle'}, headers=headers) as response:
+            ad_id = (await response.json())['id']
+        async with client.get(f'/api/ads/{ad_id}') as response:
+            params = {'owner_id': (await response.json())['owner_id']}
+
+        async def titles():
+            async with client.get('/api/ads', params=params) as response:
+                return [ad['title'] for ad in (await response.json())['items']]
+
+        seen = [await titles(), await titles()]
+        async with client.post('/api/ads', json={'title': 'Cached teapot'}, headers=headers):
+            pass
+        seen.append(await titles())
+        async with client.put(f'/api/ads/{ad_id}', json={'title': 'Cached samovar'}, headers=headers):
+            pass
+        seen.append(await titles())
+        async with client.delete(f'/api/ads/{ad_id}', headers=headers):
+            pass
+        seen.append(await titles())
+        return seen
+
+    assert with_client(scenario) == [
+        ['Cached kettle'],
+        ['Cached kettle'],
+        ['Cached teapot', 'Cached kettle'],
+        ['Cached teapot', 'Cached samovar'],
+        ['Cached teapot'],
+    ]
+
+
+def test_concurrent_list_misses_share_one_query(with_client, auth_headers, monkeypatch):
+    """Тест одного запроса к базе при одновременных промахах кэша по одному ключу"""
+    calls = []
+    get_ads_page = ads_handlers.get_ads_page
+
+    async def counted(*args, **kwargs):
+        calls.append(args)
+        # Keeps the first build in flight while the other requests arrive
+        await asyncio.sleep(0.05)
+        return await get_ads_page(*args, **kwargs)
+
+    monkeypatch.setattr(ads_handlers, 'get_ads_page', counted)
+
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.post('/api/ads', json={'title': 'Shared lamp'}, headers=headers) as response:
+            ad_id = (await response.json())['id']
+        async with client.get(f'/api/ads/{ad_id}') as response:
+            owner_id = (await response.json())['owner_id']
+
+        async def fetch():
+            async with client.get('/api/ads', params={'owner_id': owner_id}) as response:
+                return response.status, await response.read()
+
+        return await asyncio.gather(*(fetch() for _ in range(10)))
+
+    responses = with_client(scenario)
+    assert len(calls) == 1
+    assert {status for status, _ in responses} == {200}
+    assert len({body for _, body in responses}) == 1
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.config import ADS_LOOKUP_MAX_IDS
+from app.database import ad_loader
+
+
+def test_lookup_keeps_order_and_reports_missing(with_client, auth_headers):
+    """Тест получения нескольких объявлений по списку ID"""
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.post('/api/ads/batch', json=[{'title': f'Feed ad {i}'} for i in range(3)],
+                               headers=headers) as response:
+            ids = [result['id'] for result in (await response.json())['results']]
+
+        missing = ids[-1] + 1000
+        requested = [ids[2], missing, ids[0], ids[2]]
+        async with client.get('/api/ads', params={'ids': ','.join(map(str, requested))}) as response:
+            return ids, missing, response.status, await response.json()
+
+    ids, missing, status, body = with_client(scenario)
+    assert status == 200
+    assert [item['id'] for item in body['items']] == [ids[2], ids[0]]
+    assert [item['title'] for item in body['items']] == ['Feed ad 2', 'Feed ad 0']
+    assert body['missing'] == [missing]
+
+
+def test_lookup_rejects_bad_ids(with_client):
+    """Тест отклонения некорректного списка ID"""
+    async def scenario(client):
+        statuses = []
+        for ids in ('', '1,,2', '1,-2', 'abc', ' 1', str(2 ** 63),
+                    ','.join(str(i) for i in range(1, ADS_LOOKUP_MAX_IDS + 2))):
+            async with client.get('/api/ads', params={'ids': ids}) as response:
+                statuses.append(response.status)
+        return statuses
+
+    assert with_client(scenario) == [400] * 7
+
+
+def test_concurrent_gets_share_one_query(with_client, auth_headers):
+    """Тест одного запроса к базе на одновременные GET одного объявления вместе с ETag"""
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.post('/api/ads', json={'title': 'Viral ad'}, headers=headers) as response:
+            ad_id = (await response.json())['id']
+
+        async def fetch():
+            async with client.get(f'/api/ads/{ad_id}') as response:
+                return response.status, response.headers['ETag']
+
+        batches = ad_loader.stats()['batches']
+        responses = await asyncio.gather(*(fetch() for _ in range(20)))
+        return ad_id, responses, ad_loader.stats()['batches'] - batches
+
+    ad_id, responses, batches = with_client(scenario)
+    assert responses == [(200, f'"ad-{ad_id}-v1"')] * 20
+    assert batches == 1
@@ -0,0 +1,54 @@
+import asyncio
+
+
+def _create(client, headers, title='Owned ad'):
+    return client.post('/api/ads', json={'title': title}, headers=headers)
+
+
+def test_update_and_delete_check_ownership(with_client, auth_headers):
+    """Тест проверки владельца при изменении и удалении объявления"""
+    async def scenario(client):
+        owner, other = await auth_headers(client), await auth_headers(client)
+        async with _create(client, owner) as response:
+            ad_id = (await response.json())['id']
+
+        statuses = {}
+        async with client.put(f'/api/ads/{ad_id}', json={'title': 'Stolen'}, headers=other) as response:
+            statuses['update_other'] = response.status
+        async with client.delete(f'/api/ads/{ad_id}', headers=other) as response:
+            statuses['delete_other'] = response.status
+        async with client.put(f'/api/ads/{ad_id}', json={'title': 'Renamed'}, headers=owner) as response:
+            statuses['update_owner'] = response.status
+        async with client.get(f'/api/ads/{ad_id}') as response:
+            statuses['title'] = (await response.json())['title']
+            statuses['etag'] = response.headers['ETag']
+        async with client.delete(f'/api/ads/{ad_id}', headers=owner) as response:
+            statuses['delete_owner'] = response.status
+        async with client.put(f'/api/ads/{ad_id}', json={'title': 'Gone'}, headers=owner) as response:
+            statuses['update_missing'] = response.status
+        async with client.delete(f'/api/ads/{ad_id}', headers=owner) as response:
+            statuses['delete_missing'] = response.status
+        return ad_id, statuses
+
+    ad_id, statuses = with_client(scenario)
+    assert statuses == {
+        'update_other': 403, 'delete_other': 403,
+        'update_owner': 200, 'title': 'Renamed', 'etag': f'"ad-{ad_id}-v2"',
+        'delete_owner': 200, 'update_missing': 404, 'delete_missing': 404,
+    }
+
+
+def test_concurrent_deletes_succeed_once(with_client, auth_headers):
+    """Тест однократного удаления при одновременных запросах"""
+    async def scenario(client):
+        owner = await auth_headers(client)
+        async with _create(client, owner) as response:
+            ad_id = (await response.json())['id']
+
+        async def delete():
+            async with client.delete(f'/api/ads/{ad_id}', headers=owner) as response:
+                return response.status
+
+        return sorted(await asyncio.gather(*(delete() for _ in range(5))))
+
+    assert with_client(scenario) == [200, 404, 404, 404, 404]
@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+
+
+def test_duplicate_registration_is_rejected_once(with_client):
+    """Тест одновременной регистрации одного email в разном регистре"""
+    local = uuid.uuid4().hex
+
+    async def scenario(client):
+        async def register(email):
+            user = {'email': email, 'username': 'racer', 'password': 'password123'}
+            async with client.post('/api/auth/register', json=user) as response:
+                return response.status, await response.json()
+
+        results = await asyncio.gather(
+            register(f"{local}@example.com"), register(f"{local.upper()}@Example.COM"),
+            register(f" {local}@example.com ")
+        )
+        async with client.post('/api/auth/login', json={
+            'email': f"{local.upper()}@EXAMPLE.com", 'password': 'password123'
+        }) as response:
+            return results, response.status, await response.json()
+
+    results, login_status, login = with_client(scenario)
+    assert sorted(status for status, _ in results) == [201, 400, 400]
+    assert all(body['error'] == "Email already registered" for status, body in results if status == 400)
+    assert login_status == 200
+    assert login['email'] == f"{local}@example.com"
+
+
+def test_email_lookup_uses_expression_index(with_client):
+    """Тест использования индекса lower(email) при поиске пользователя"""
+    from app import database
+
+    async def scenario(client):
+        async with database._reader() as db:
+            cursor = await db.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM users WHERE lower(email) = ?", ("a@b.cd",)
+            )
+            return [row[-1] for row in await cursor.fetchall()]
+
+    plan = with_client(scenario)
+    assert any("idx_users_email_lower" in step for step in plan)
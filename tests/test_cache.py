@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.cache import BatchLoader
+
+
+class Source:
+    """load_many() that records every batch it is asked for"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def load_many(self, keys):
+        self.batches.append(sorted(keys))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("database is down")
+        return {key: f"ad {key}" for key in keys if key != 404}
+
+
+def run_loader(scenario, fail=False, max_batch_size=100):
+    source = Source(fail)
+
+    async def main():
+        return await scenario(BatchLoader(source.load_many, max_batch_size))
+
+    return asyncio.run(main()), source.batches
+
+
+def test_same_key_shares_one_load():
+    """Тест объединения одновременных чтений одного ключа"""
+    async def scenario(loader):
+        return await asyncio.gather(*(loader.load(7) for _ in range(50))), loader.stats()
+
+    (values, stats), batches = run_loader(scenario)
+    assert values == ["ad 7"] * 50
+    assert batches == [[7]]
+    assert stats == {"loads": 1, "shared": 49, "batches": 1}
+
+
+def test_keys_from_one_iteration_are_batched():
+    """Тест одного запроса для разных ключей из одной итерации цикла"""
+    async def scenario(loader):
+        return await asyncio.gather(*(loader.load(key) for key in (3, 1, 404, 2)))
+
+    values, batches = run_loader(scenario)
+    assert values == ["ad 3", "ad 1", None, "ad 2"]
+    assert batches == [[1, 2, 3, 404]]
+
+
+def test_batches_are_capped():
+    """Тест разбиения на пакеты ограниченного размера"""
+    async def scenario(loader):
+        return await asyncio.gather(*(loader.load(key) for key in range(5)))
+
+    values, batches = run_loader(scenario, max_batch_size=2)
+    assert len(values) == 5
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_late_caller_joins_load_in_flight_until_cleared():
+    """Тест присоединения к идущему чтению и его сброса после записи"""
+    async def scenario(loader):
+        first = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.001)
+        joined = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0)
+        loader.clear()
+        fresh = asyncio.ensure_future(loader.load(1))
+        return await asyncio.gather(first, joined, fresh)
+
+    values, batches = run_loader(scenario)
+    assert values == ["ad 1"] * 3
+    assert batches == [[1], [1]]
+
+
+def test_errors_reach_every_caller():
+    """Тест передачи ошибки всем ожидающим"""
+    async def scenario(loader):
+        results = await asyncio.gather(loader.load(1), loader.load(1), loader.load(2),
+                                       return_exceptions=True)
+        # Nothing is left behind: the next load queries again
+        with pytest.raises(RuntimeError):
+            await loader.load(1)
+        return results
+
+    results, batches = run_loader(scenario, fail=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batches == [[1, 2], [1]]
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Тест отмены одного ожидающего без отмены общего чтения"""
+    async def scenario(loader):
+        cancelled = asyncio.ensure_future(loader.load(1))
+        other = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.001)
+        cancelled.cancel()
+        return await other
+
+    value, _ = run_loader(scenario)
+    assert value == "ad 1"
@@ -0,0 +1,44 @@
+def test_ad_etag_revalidation(with_client, auth_headers):
+    """Тест ответа 304 для объявления и смены ETag после изменения"""
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.post('/api/ads', json={'title': 'Etag lamp'}, headers=headers) as response:
+            ad_id = (await response.json())['id']
+
+        async with client.get(f'/api/ads/{ad_id}') as response:
+            etag = response.headers['ETag']
+        async with client.get(f'/api/ads/{ad_id}', headers={'If-None-Match': etag}) as response:
+            revalidated = response.status, response.headers['ETag'], await response.read()
+
+        async with client.put(f'/api/ads/{ad_id}', json={'title': 'Etag lamp, new bulb'}, headers=headers):
+            pass
+        async with client.get(f'/api/ads/{ad_id}', headers={'If-None-Match': etag}) as response:
+            changed = response.status, response.headers['ETag'], (await response.json())['title']
+        return etag, revalidated, changed
+
+    etag, revalidated, changed = with_client(scenario)
+    assert revalidated == (304, etag, b'')
+    assert changed[0] == 200
+    assert changed[1] != etag
+    assert changed[2] == 'Etag lamp, new bulb'
+
+
+def test_list_etag_revalidation(with_client, auth_headers):
+    """Тест ответа 304 для списка объявлений и смены ETag после изменения"""
+    async def scenario(client):
+        headers = await auth_headers(client)
+        async with client.get('/api/ads') as response:
+            etag = response.headers['ETag']
+        async with client.get('/api/ads', headers={'If-None-Match': etag}) as response:
+            revalidated = response.status, response.headers['ETag'], await response.read()
+
+        async with client.post('/api/ads', json={'title': 'Etag chair'}, headers=headers):
+            pass
+        async with client.get('/api/ads', headers={'If-None-Match': etag}) as response:
+            changed = response.status, response.headers['ETag']
+        return etag, revalidated, changed
+
+    etag, revalidated, changed = with_client(scenario)
+    assert revalidated == (304, etag, b'')
+    assert changed[0] == 200
+    assert changed[1] != etag
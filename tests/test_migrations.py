@@ -0,0 +1,156 @@
+import asyncio
+import os
+import tempfile
+
+import aiosqlite
+import pytest
+
+from app.migrations import (
+    MIGRATIONS, Migration, migrate, pending_backfills, run_backfills, schema_version,
+    transaction_submit
+)
+
+
+def run_db(scenario):
+    async def main():
+        path = os.path.join(tempfile.mkdtemp(prefix="ads-migrations-"), "ads.db")
+        db = await aiosqlite.connect(path, isolation_level=None)
+        try:
+            return await scenario(db, path)
+        finally:
+            await db.close()
+
+    return asyncio.run(main())
+
+
+async def objects(db):
+    cursor = await db.execute("SELECT type, name FROM sqlite_master ORDER BY type, name")
+    rows = await cursor.fetchall()
+    await cursor.close()
+    return rows
+
+
+def test_fresh_database_is_migrated_once():
+    """Тест применения миграций к новой базе и пропуска при повторном запуске"""
+    async def scenario(db, path):
+        first = await migrate(db)
+        schema = await objects(db)
+        second = await migrate(db)
+        return first, second, schema, await objects(db), await schema_version(db)
+
+    first, second, schema, again, version = run_db(scenario)
+    assert first == second == version == MIGRATIONS[-1].version
+    assert schema == again
+    names = {name for _, name in schema}
+    assert {'users', 'ads', 'ads_fts', 'idx_ads_created_ts_id', 'idx_ads_owner_created_ts', 'idx_ads_title', 'idx_users_email_lower'} <= names
+
+
+def test_legacy_database_is_adopted():
+    """Тест перевода базы, созданной до учёта миграций"""
+    async def scenario(db, path):
+        await db.execute("""
+            CREATE TABLE ads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, owner_id INTEGER NOT NULL
+            )
+        """)
+        await db.execute(
+            "INSERT INTO ads (title, description, created_at, owner_id) "
+            "VALUES ('Old bicycle', 'red', '2024-01-01 10:00:00.500000', 1)"
+        )
+        await migrate(db)
+        cursor = await db.execute("SELECT version, created_ts FROM ads")
+        before = [tuple(row) for row in await cursor.fetchall()]
+        await run_backfills(transaction_submit(db), batch_size=10, pause=0)
+        cursor = await db.execute("SELECT version, created_ts, created_at FROM ads")
+        after = [tuple(row) for row in await cursor.fetchall()]
+        cursor = await db.execute("SELECT rowid FROM ads_fts WHERE ads_fts MATCH 'bicycle'")
+        hits = [row[0] for row in await cursor.fetchall()]
+        cursor = await db.execute("SELECT value FROM change_counters WHERE name = 'ads'")
+        counter = (await cursor.fetchone())[0]
+        return before, after, hits, counter, await pending_backfills(db)
+
+    before, after, hits, counter, left = run_db(scenario)
+    # created_ts is filled by the online backfill, not at boot
+    assert before == [(1, None)]
+    # Reads show created_ts from then on, so ETags must change too
+    assert after == [(2, 1704103200, '2024-01-01 10:00:00.500000')]
+    assert hits == [1]
+    assert counter == 1
+    assert left == []
+
+
+def test_concurrent_processes_apply_each_step_once():
+    """Тест одновременной миграции из нескольких соединений"""
+    async def scenario(db, path):
+        connections = [await aiosqlite.connect(path, isolation_level=None) for _ in range(4)]
+        try:
+            return await asyncio.gather(*(migrate(conn) for conn in connections))
+        finally:
+            for conn in connections:
+                await conn.close()
+
+    assert run_db(scenario) == [MIGRATIONS[-1].version] * 4
+
+
+def test_newer_database_is_rejected():
+    """Тест отказа работать с базой новее кода"""
+    async def scenario(db, path):
+        await db.execute(f"PRAGMA user_version = {MIGRATIONS[-1].version + 1}")
+        await migrate(db)
+
+    with pytest.raises(RuntimeError):
+        run_db(scenario)
+
+
+async def _uppercase_titles(db, after_id, batch_size):
+    cursor = await db.execute(
+        "SELECT id FROM ads WHERE id > ? ORDER BY id LIMIT ?", (after_id, batch_size)
+    )
+    ids = [row[0] for row in await cursor.fetchall()]
+    await cursor.close()
+    if not ids:
+        return None
+    await db.execute("UPDATE ads SET title = upper(title) WHERE id BETWEEN ? AND ?", (ids[0], ids[-1]))
+    return ids[-1]
+
+
+def test_backfill_runs_in_batches_and_resumes():
+    """Тест пакетного заполнения данных с продолжением после перезапуска"""
+    migrations = [*MIGRATIONS, Migration(MIGRATIONS[-1].version + 1, "upper_titles",
+                                         lambda db: asyncio.sleep(0), _uppercase_titles)]
+
+    async def scenario(db, path):
+        await migrate(db)
+        await run_backfills(transaction_submit(db), pause=0)
+        await db.executemany(
+            "INSERT INTO ads (title, owner_id) VALUES (?, 1)", [(f"ad {i}",) for i in range(25)]
+        )
+        await migrate(db, migrations)
+        pending = await pending_backfills(db)
+
+        submit = transaction_submit(db)
+        batches = 0
+
+        async def interrupted(op):
+            nonlocal batches
+            batches += 1
+            if batches > 2:
+                raise RuntimeError("stopped")
+            return await submit(op)
+
+        with pytest.raises(RuntimeError):
+            await run_backfills(interrupted, migrations[-1:], batch_size=10, pause=0)
+        cursor = await db.execute("SELECT count(*) FROM ads WHERE title = upper(title)")
+        halfway = (await cursor.fetchone())[0]
+
+        await run_backfills(submit, migrations, batch_size=10, pause=0)
+        cursor = await db.execute("SELECT count(*) FROM ads WHERE title = upper(title)")
+        done = (await cursor.fetchone())[0]
+        return pending, halfway, done, await pending_backfills(db)
+
+    pending, halfway, done, left = run_db(scenario)
+    assert pending == [migrations[-1].version]
+    assert halfway == 20
+    assert done == 25
+    assert left == []
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    """Тест кодирования и декодирования курсора"""
+    cursor = encode_cursor(["2024-01-01T00:00:00", 42])
+    assert decode_cursor(cursor, (str, int)) == ["2024-01-01T00:00:00", 42]
+
+
+@pytest.mark.parametrize("values", [
+    [[1], 2],
+    [None, 2],
+    ["2024-01-01", "2"],
+    ["2024-01-01", 2.5],
+    ["2024-01-01", True],
+    ["2024-01-01", 10 ** 30],
+    ["2024-01-01"],
+    {"created_at": "2024-01-01", "id": 2},
+])
+def test_cursor_rejects_wrong_types(values):
+    """Тест отклонения курсора с неверными типами значений"""
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), (str, int))
+
+
+def test_score_cursor_rejects_non_finite():
+    """Тест отклонения курсора поиска с NaN"""
+    assert decode_cursor(encode_cursor([0, 1]), (float, int)) == [0.0, 1]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([float("nan"), 1]), (float, int))
+
+
+def test_cursor_rejects_garbage():
+    """Тест отклонения повреждённого курсора"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-base64!", (str, int))
+
+
+def test_ads_pages_cover_all_rows(with_client):
+    """Тест обхода всех объявлений по курсору без пропусков и повторов"""
+    from app.database import create_ads
+
+    async def scenario(client):
+        base = datetime(2024, 1, 1)
+        # Equal timestamps make the id the tie-breaker
+        created = await create_ads([
+            {'title': f'Page ad {i}', 'owner_id': 1, 'created_at': base + timedelta(minutes=i // 3)}
+            for i in range(10)
+        ])
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            async with client.get('/api/ads', params=params) as response:
+                assert response.status == 200
+                data = await response.json()
+            seen += [ad['id'] for ad in data['items']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        return created, seen
+
+    created, seen = with_client(scenario)
+    assert len(seen) == len(set(seen))
+    assert set(created) <= set(seen)
+
+
+@pytest.mark.parametrize("path, params", [('/api/ads', {}), ('/api/ads/search', {'q': 'ad'})])
+@pytest.mark.parametrize("values", [[[1], 2], [1.5, 10 ** 30], [1.5, "1"]])
+def test_invalid_cursor_returns_400(with_client, path, params, values):
+    """Тест ответа 400 на курсор с неверными значениями"""
+    async def scenario(client):
+        params['cursor'] = encode_cursor(values)
+        async with client.get(path, params=params) as response:
+            return response.status
+
+    assert with_client(scenario) == 400
@@ -0,0 +1,44 @@
+import uuid
+
+
+def test_search_ranking_prefix_snippets_and_cursor(with_client, auth_headers):
+    """Тест ранжирования bm25, поиска по префиксу, сниппетов и обхода по курсору"""
+    # A token unique to this test keeps ads from other tests out of the results
+    term = f"zq{uuid.uuid4().hex[:10]}"
+
+    async def scenario(client):
+        headers = await auth_headers(client)
+        ads = [
+            {'title': 'Plain sofa', 'description': f'Comes with a {term} cover'},
+            {'title': f'Red {term} bicycle', 'description': 'Barely used'},
+        ] + [{'title': f'Lot {i}', 'description': f'Another {term} lot'} for i in range(7)]
+        async with client.post('/api/ads/batch', json=ads, headers=headers) as response:
+            ids = [result['id'] for result in (await response.json())['results']]
+
+        async with client.get('/api/ads/search', params={'q': term, 'limit': 20}) as response:
+            assert response.status == 200
+            ranked = (await response.json())['items']
+        async with client.get('/api/ads/search', params={'q': term[:6] + '*', 'limit': 20}) as response:
+            prefixed = [ad['id'] for ad in (await response.json())['items']]
+
+        walked, cursor = [], None
+        while True:
+            params = {'q': term, 'limit': 2, **({'cursor': cursor} if cursor else {})}
+            async with client.get('/api/ads/search', params=params) as response:
+                assert response.status == 200
+                data = await response.json()
+            walked += [ad['id'] for ad in data['items']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        return ids, ranked, prefixed, walked
+
+    ids, ranked, prefixed, walked = with_client(scenario)
+    # The title hit outranks every description-only hit
+    assert ranked[0]['id'] == ids[1]
+    assert {ad['id'] for ad in ranked} == set(ids)
+    assert f'<mark>{term}</mark>' in ranked[0]['snippet']
+    assert all('<mark>' in ad['snippet'] for ad in ranked)
+    assert set(ids) <= set(prefixed)
+    assert walked == [ad['id'] for ad in ranked]
+    assert len(walked) == len(set(walked))
@@ -0,0 +1,20 @@
+import asyncio
+
+from app import security
+
+
+def test_cancelled_hash_keeps_slot_until_job_finishes():
+    """Тест учёта отменённых задач хеширования до их завершения"""
+    async def main():
+        hashed = security.get_password_hash("password123")
+        task = asyncio.create_task(security.verify_password_async("password123", hashed))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0)
+        held = security._pending
+        while security._pending:
+            await asyncio.sleep(0.01)
+        await security.shutdown_password_executor()
+        return held
+
+    assert asyncio.run(main()) == 1
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+
+def imported_after(statement):
+    """Heavy modules loaded by statement in a fresh interpreter"""
+    code = (
+        f"import sys; {statement}; "
+        "print(' '.join(m for m in ('passlib', 'jwt', 'app.api.handlers.ads') if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.split()
+
+
+def test_create_app_defers_heavy_imports():
+    """Тест отложенной загрузки тяжёлых модулей при старте"""
+    loaded = imported_after("import asyncio, run; asyncio.run(run.create_app())")
+    assert loaded == []
+
+
+def test_preload_imports_handlers():
+    """Тест предварительной загрузки обработчиков перед запуском воркеров"""
+    loaded = imported_after(
+        "from app.api.routes import preload_handlers; preload_handlers(); "
+        "from app.security import preload; preload()"
+    )
+    assert set(loaded) == {'passlib', 'app.api.handlers.ads'}
@@ -0,0 +1,50 @@
+from app.validators import (
+    Field, compile_schema, validate_many, validate_user_registration, validate_ad_creation,
+    validate_ad_update
+)
+
+
+def test_registration_errors_keep_their_shape():
+    """Тест формата ошибок валидации регистрации"""
+    errors = validate_user_registration({'email': ' bad@mail ', 'password': 'short', 'username': 'a b'})
+    assert errors == {
+        'email': ["Invalid email format: 'bad@mail'"],
+        'password': ["Password must be at least 8 characters long"],
+        'username': ["Username can only contain letters, numbers and underscores"],
+    }
+    assert list(validate_user_registration({'username': 'ab'})) == ['required', 'username']
+    assert validate_user_registration(
+        {'email': 'user@example.com', 'password': 'password123', 'username': 'user_1'}
+    ) == {}
+
+
+def test_blank_title_is_both_required_and_too_short():
+    """Тест ошибок для заголовка из пробелов"""
+    assert validate_ad_creation({'title': '   '}) == {
+        'required': ["Field 'title' is required"],
+        'title': ["Title must be at least 3 characters long"],
+    }
+    assert validate_ad_creation({'title': 'x' * 201, 'description': 'y' * 2001}) == {
+        'title': ["Title must not exceed 200 characters"],
+        'description': ["Description must not exceed 2000 characters"],
+    }
+
+
+def test_update_needs_a_field():
+    """Тест требования хотя бы одного поля при обновлении"""
+    assert validate_ad_update({}) == {
+        'general': ["At least one field (title or description) must be provided for update"]
+    }
+    assert validate_ad_update({'description': ''}) == {}
+
+
+def test_custom_schema_and_batch():
+    """Тест собственной схемы и пакетной валидации"""
+    validate = compile_schema([Field('code', required=True, max_length=4, pattern=r'^[A-Z]+$',
+                                     pattern_message="Code '{value}' must be upper case")])
+    assert validate_many(validate, [{'code': 'ABC'}, {'code': 'abcde'}, [], {}]) == [
+        {},
+        {'code': ["Code must not exceed 4 characters", "Code 'abcde' must be upper case"]},
+        {'general': ["Item must be a JSON object"]},
+        {'required': ["Field 'code' is required"]},
+    ]
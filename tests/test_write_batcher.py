@@ -0,0 +1,131 @@
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from app.write_batcher import WriteBatcher
+
+
+class FlakyConnection:
+    """Connection that fails the given statements once each"""
+
+    def __init__(self, db, fail):
+        self.db = db
+        self.fail = set(fail)
+
+    @property
+    def in_transaction(self):
+        return self.db.in_transaction
+
+    async def execute(self, sql, *args):
+        if sql in self.fail:
+            self.fail.discard(sql)
+            raise sqlite3.OperationalError(f"{sql} failed")
+        return await self.db.execute(sql, *args)
+
+
+def run_batcher(scenario, window_ms=5, max_size=64, fail=()):
+    async def main():
+        db = await aiosqlite.connect(":memory:", isolation_level=None)
+        await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+        batcher = WriteBatcher(window_ms, max_size)
+        await batcher.start(FlakyConnection(db, fail))
+        try:
+            return await scenario(batcher, db)
+        finally:
+            await batcher.stop()
+            await db.close()
+
+    return asyncio.run(main())
+
+
+def insert(name):
+    async def op(db):
+        cursor = await db.execute("INSERT INTO items (name) VALUES (?)", (name,))
+        return cursor.lastrowid
+    return op
+
+
+async def names(db):
+    cursor = await db.execute("SELECT name FROM items ORDER BY id")
+    return [row[0] for row in await cursor.fetchall()]
+
+
+def test_concurrent_writes_share_one_commit():
+    """Тест объединения одновременных записей в один коммит"""
+    async def scenario(batcher, db):
+        ids = await asyncio.gather(*(batcher.submit(insert(f"item{i}")) for i in range(10)))
+        return ids, batcher.stats(), await names(db)
+
+    ids, stats, stored = run_batcher(scenario)
+    assert ids == list(range(1, 11))
+    assert stats["batches"] == 1 and stats["writes"] == 10
+    assert stored == [f"item{i}" for i in range(10)]
+
+
+def test_max_size_splits_batches():
+    """Тест ограничения размера пакета"""
+    async def scenario(batcher, db):
+        await asyncio.gather(*(batcher.submit(insert(f"item{i}")) for i in range(10)))
+        return batcher.stats()
+
+    stats = run_batcher(scenario, max_size=4)
+    assert stats["batches"] == 3 and stats["max_batch_size"] == 4
+
+
+def test_failing_op_is_rolled_back_alone():
+    """Тест отката только упавшей операции внутри пакета"""
+    async def failing(db):
+        await db.execute("INSERT INTO items (name) VALUES ('partial')")
+        await db.execute("INSERT INTO items (name) VALUES ('a')")
+
+    async def scenario(batcher, db):
+        results = await asyncio.gather(
+            batcher.submit(insert("a")), batcher.submit(failing), batcher.submit(insert("b")),
+            return_exceptions=True
+        )
+        return results, await names(db)
+
+    results, stored = run_batcher(scenario)
+    assert isinstance(results[0], int) and isinstance(results[2], int)
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert stored == ["a", "b"]
+
+
+def test_batch_failure_reaches_every_caller():
+    """Тест передачи ошибки коммита всем участникам пакета"""
+    async def scenario(batcher, db):
+        results = await asyncio.gather(
+            batcher.submit(insert("a")), batcher.submit(insert("b")), return_exceptions=True
+        )
+        return results, await names(db)
+
+    results, stored = run_batcher(scenario, fail={"COMMIT"})
+    assert all(isinstance(result, sqlite3.OperationalError) for result in results)
+    assert stored == []
+
+
+def test_loop_survives_failed_rollback():
+    """Тест продолжения работы после неудачного ROLLBACK"""
+    async def scenario(batcher, db):
+        with pytest.raises(sqlite3.OperationalError):
+            await asyncio.wait_for(batcher.submit(insert("lost")), 1)
+        return await asyncio.wait_for(batcher.submit(insert("kept")), 1), await names(db)
+
+    result, stored = run_batcher(scenario, fail={"COMMIT", "ROLLBACK"})
+    assert isinstance(result, int)
+    assert stored == ["kept"]
+
+
+def test_submit_fails_fast_when_loop_is_gone():
+    """Тест немедленной ошибки при остановленном цикле записи"""
+    async def scenario(batcher, db):
+        batcher._task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batcher._task
+        with pytest.raises(RuntimeError):
+            await batcher.submit(insert("a"))
+        batcher._task = None
+
+    run_batcher(scenario)